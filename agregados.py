@@ -0,0 +1,194 @@
+import pandas as pd
+import numpy as np
+import threading
+import copy
+from collections import OrderedDict
+
+import dados
+
+# ==============================================================================
+# 1. MÉTRICAS E FAIXAS DOS HISTOGRAMAS
+# ==============================================================================
+# Percentis saem de histogramas de faixas fixas, que se somam: uma medição nova só
+# incrementa uma faixa, sem reler o histórico. Valores fora do intervalo caem na
+# primeira/última faixa. A interpolação dentro da faixa só é boa com muitas medições
+# (com duas, a mediana fica na faixa da menor, não entre as duas): até MAX_EXATO
+# medições no mês os valores também são guardados e os percentis saem exatos.
+FAIXAS = {  # métrica: (início, fim, largura)
+    "Peso": (30.0, 200.0, 0.5),
+    "Perc_Gordura": (0.0, 70.0, 0.25),
+    "Perc_Musc": (0.0, 70.0, 0.25),
+    "Visceral": (0.0, 40.0, 1.0),
+}
+METRICAS = list(FAIXAS)
+PERCENTIS = [10, 25, 50, 75, 90]
+MAX_EXATO = 100
+
+# ==============================================================================
+# 2. ACUMULADORES POR MÊS
+# ==============================================================================
+class _Acumulador:
+    """Contagem, soma, soma dos quadrados, mínimo, máximo e histograma de uma métrica, por mês.
+
+    `valores` guarda as medições dos meses com até MAX_EXATO delas (None nos demais).
+    """
+
+    def __init__(self, faixa, n_meses=0):
+        self.inicio, fim, self.largura = faixa
+        self.n_faixas = int(round((fim - self.inicio) / self.largura))
+        self.n = np.zeros(n_meses)
+        self.soma = np.zeros(n_meses)
+        self.soma2 = np.zeros(n_meses)
+        self.minimo = np.full(n_meses, np.inf)
+        self.maximo = np.full(n_meses, -np.inf)
+        self.histograma = np.zeros((n_meses, self.n_faixas))
+        self.valores = [[] for _ in range(n_meses)]
+
+    def novo_mes(self, posicao):
+        self.n, self.soma, self.soma2 = (np.insert(a, posicao, 0.0) for a in (self.n, self.soma, self.soma2))
+        self.minimo = np.insert(self.minimo, posicao, np.inf)
+        self.maximo = np.insert(self.maximo, posicao, -np.inf)
+        self.histograma = np.insert(self.histograma, posicao, 0.0, axis=0)
+        self.valores.insert(posicao, [])
+
+    def adicionar(self, meses, valores):
+        """Soma as medições (arrays de posição do mês e valor); vale para 1 ou 1 milhão."""
+        ok = ~np.isnan(valores)
+        meses, valores = meses[ok], valores[ok]
+        total = len(self.n)
+        self.n += np.bincount(meses, minlength=total)
+        self.soma += np.bincount(meses, weights=valores, minlength=total)
+        self.soma2 += np.bincount(meses, weights=valores * valores, minlength=total)
+        np.minimum.at(self.minimo, meses, valores)
+        np.maximum.at(self.maximo, meses, valores)
+        faixa = np.clip(((valores - self.inicio) // self.largura).astype(np.int64), 0, self.n_faixas - 1)
+        self.histograma += np.bincount(meses * self.n_faixas + faixa,
+                                       minlength=total * self.n_faixas).reshape(total, self.n_faixas)
+        for mes in np.unique(meses):
+            if self.n[mes] > MAX_EXATO: self.valores[mes] = None
+        guardar = np.isin(meses, [mes for mes, lista in enumerate(self.valores) if lista is not None])
+        for mes, valor in zip(meses[guardar].tolist(), valores[guardar].tolist()): self.valores[mes].append(valor)
+
+    def percentis(self, histograma, n):
+        """Percentis por linha do histograma, interpolando dentro da faixa (estimativa)."""
+        acumulado = histograma.cumsum(axis=1)
+        resultado = {}
+        for p in PERCENTIS:
+            alvo = n[:, None] * p / 100
+            faixa = np.minimum((acumulado < alvo).sum(axis=1), self.n_faixas - 1)
+            linhas = np.arange(len(n))
+            antes = np.where(faixa > 0, acumulado[linhas, np.maximum(faixa - 1, 0)], 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                fracao = np.clip((alvo[:, 0] - antes) / histograma[linhas, faixa], 0, 1)
+            resultado[p] = np.where(n > 0, self.inicio + (faixa + fracao) * self.largura, np.nan)
+        return resultado
+
+# ==============================================================================
+# 3. AGREGADOS DO GRUPO
+# ==============================================================================
+class AgregadosGrupo:
+    """Agregados mensais do grupo para uma versão dos dados, mantidos entre inserções.
+
+    Construídos numa passada vetorizada sobre o histórico; depois, cada medição nova só
+    soma a própria contribuição (adicionar), então a tela não relê o histórico. O objeto
+    publicado no registro não é mais alterado: a medição é somada a uma cópia (copia).
+    """
+
+    def __init__(self, df, versao):
+        self.versao = versao
+        self.meses = np.array([], dtype='datetime64[M]')
+        self.acumuladores = {m: _Acumulador(FAIXAS[m]) for m in METRICAS}
+        self.medicoes = 0
+        self._estatisticas = {}
+        self.adicionar(df, versao)
+
+    def _posicoes(self, datas):
+        """Posição do mês de cada data, criando os meses que ainda não existem."""
+        meses = datas.astype('datetime64[M]')
+        for mes in np.setdiff1d(np.unique(meses), self.meses):
+            posicao = np.searchsorted(self.meses, mes)
+            self.meses = np.insert(self.meses, posicao, mes)
+            for acumulador in self.acumuladores.values(): acumulador.novo_mes(posicao)
+        return np.searchsorted(self.meses, meses)
+
+    def adicionar(self, df, versao):
+        validos = df[df['Data'].notna()]
+        posicoes = self._posicoes(validos['Data'].to_numpy(dtype='datetime64[ns]'))
+        for metrica, acumulador in self.acumuladores.items():
+            acumulador.adicionar(posicoes, dados.valores_float64(validos[metrica]))
+        self.medicoes += len(validos)
+        self.versao = versao
+        self._estatisticas = {}
+
+    def copia(self):
+        """Cópia com acumuladores próprios, para somar medições sem mexer nesta."""
+        nova = copy.copy(self)
+        nova.acumuladores = {m: copy.deepcopy(a) for m, a in self.acumuladores.items()}
+        nova._estatisticas = {}
+        return nova
+
+    def estatisticas(self, metrica):
+        """Uma linha por mês: N, média, desvio, mínimo, percentis e máximo."""
+        if metrica not in self._estatisticas:
+            a = self.acumuladores[metrica]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                media = a.soma / a.n
+                desvio = np.sqrt(np.maximum(a.soma2 / a.n - media * media, 0))
+            tabela = pd.DataFrame({"N": a.n.astype(int), "Média": media, "Desvio": desvio,
+                                   "Mínimo": np.where(a.n > 0, a.minimo, np.nan)},
+                                  index=pd.PeriodIndex(self.meses.astype(str), freq='M', name='Mês'))
+            percentis = a.percentis(a.histograma, a.n)
+            for mes, valores in enumerate(a.valores):
+                if not valores: continue  # mês grande (None) ou sem medições
+                for p, exato in zip(PERCENTIS, np.percentile(valores, PERCENTIS)): percentis[p][mes] = exato
+            for p, valores in percentis.items():
+                tabela[f"P{p}"] = np.clip(valores, a.minimo, a.maximo)  # a faixa passa do maior valor
+            tabela["Máximo"] = np.where(a.n > 0, a.maximo, np.nan)
+            self._estatisticas[metrica] = tabela[tabela["N"] > 0]
+        return self._estatisticas[metrica]
+
+    def distribuicao(self, metrica, ultimos_meses=None):
+        """Histograma (centro da faixa, quantidade) somado nos últimos meses (ou em todos)."""
+        a = self.acumuladores[metrica]
+        contagem = a.histograma[-ultimos_meses:] if ultimos_meses else a.histograma
+        centros = a.inicio + (np.arange(a.n_faixas) + 0.5) * a.largura
+        serie = pd.Series(contagem.sum(axis=0), index=centros)
+        usados = np.flatnonzero(serie.to_numpy())
+        return serie.iloc[usados[0]:usados[-1] + 1] if len(usados) else serie.iloc[:0]
+
+# ==============================================================================
+# 4. REGISTRO POR GRUPO (COMPARTILHADO ENTRE SESSÕES)
+# ==============================================================================
+_trava = threading.Lock()
+_agregados = OrderedDict()
+
+def agregados_do_grupo(df, versao, banco=dados.ARQUIVO_BANCO):
+    """Agregados da versão `versao`; só reconstrói se ninguém registrou as inserções.
+
+    Uma versão mais antiga que a publicada (fragmento de uma sessão que ainda não releu
+    os dados) é montada à parte, sem substituir os agregados mais novos.
+    """
+    with _trava:
+        tabela = _agregados.get(banco)
+        if tabela is None or tabela.versao < versao:
+            tabela = _agregados[banco] = AgregadosGrupo(df, versao)
+        if tabela.versao == versao:
+            _agregados.move_to_end(banco)
+            while len(_agregados) > dados.MAX_BANCOS_CARREGADOS: _agregados.popitem(last=False)
+            return tabela
+    return AgregadosGrupo(df, versao)
+
+def registrar_medicao(registro, versao_anterior, versao_nova, banco=dados.ARQUIVO_BANCO):
+    """Soma uma medição recém-inserida aos agregados que estavam em dia com `versao_anterior`.
+
+    A soma é feita numa cópia, que depois substitui a publicada: quem está lendo os
+    agregados antigos (sem a trava) nunca vê arrays pela metade.
+    """
+    with _trava:
+        tabela = _agregados.get(banco)
+        if tabela is not None and tabela.versao == versao_anterior:
+            novo = pd.DataFrame([registro])
+            novo['Data'] = pd.to_datetime(novo['Data'], errors='coerce')
+            atualizada = tabela.copia()
+            atualizada.adicionar(novo, versao_nova)
+            _agregados[banco] = atualizada
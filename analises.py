@@ -0,0 +1,239 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from collections import namedtuple
+
+import dados
+import ranking
+
+# ==============================================================================
+# 1. PARÂMETROS
+# ==============================================================================
+METRICAS_SUAVIZADAS = ["Peso", "Perc_Gordura", "Perc_Musc"]
+JANELA_MEDIA = 3         # média móvel das últimas 3 medições
+SPAN_EWMA = 4            # média móvel exponencial (peso maior para as medições recentes)
+
+# Projeção: reta de mínimos quadrados do peso nos últimos JANELA_PROJECAO_DIAS dias
+# antes da última medição de cada pessoa
+JANELA_PROJECAO_DIAS = 90
+MIN_PONTOS_PROJECAO = 2
+HORIZONTE_MAXIMO_DIAS = 3 * 365  # além disso a tendência é lenta demais para prever uma data
+TOLERANCIA_META_KG = 0.1
+RITMO_ESTAVEL_KG_SEMANA = 0.05   # abaixo disso (em módulo) o peso está estável
+
+# Resumo para a IA: variação desde a primeira medição dentro de cada janela
+JANELAS_VARIACAO_DIAS = [30, 90]
+NOMES_RESUMO = {"Peso": ("Peso", "kg"), "Perc_Gordura": ("% Gordura", "p.p."), "Perc_Musc": ("% Músculo", "p.p.")}
+# Versão em faixas do resumo (chave do cache de respostas da IA)
+LARGURA_TENDENCIA = 0.25         # por semana, na unidade da métrica
+LARGURA_INDICADOR = 5.0
+VARIACAO_ESTAVEL = 0.5           # variação em 90 dias abaixo disso (em módulo) = estável
+SITUACAO_META = {"atingida": "já atingida", "tendencia_contraria": "o peso está se afastando da meta",
+                 "estavel": "peso estável, sem data prevista", "longe": f"mais de {HORIZONTE_MAXIMO_DIAS // 365} anos no ritmo atual",
+                 "poucos_dados": "poucos dados para prever", "projetada": "com data prevista no ritmo atual"}
+
+Analise = namedtuple('Analise', ['suavizado', 'projecao'])
+
+# ==============================================================================
+# 2. SÉRIES SUAVIZADAS
+# ==============================================================================
+def suavizar(df):
+    """Média móvel e EWMA de cada métrica, por pessoa e em ordem de data (mesmo índice de df).
+
+    O histórico inteiro é tratado de uma vez, sem laço por membro: a média móvel soma
+    as JANELA_MEDIA medições anteriores com groupby().shift() (muito mais rápido que
+    groupby().rolling()) e a EWMA usa groupby().ewm().
+    """
+    ordenado = df[df['Data'].notna()].sort_values(['Pessoa', 'Data'], kind='stable')
+    codigos = pd.Series(pd.factorize(ordenado['Pessoa'])[0], index=ordenado.index)
+    valores = pd.DataFrame({m: dados.valores_float64(ordenado[m]) for m in METRICAS_SUAVIZADAS},
+                           index=ordenado.index)
+    grupos = valores.groupby(codigos)
+    anteriores = [valores] + [grupos.shift(k) for k in range(1, JANELA_MEDIA)]
+    media = sum(a.fillna(0) for a in anteriores) / sum(a.notna() for a in anteriores)
+    ewma = grupos.ewm(span=SPAN_EWMA).mean().droplevel(0)
+    suavizado = pd.concat([media.add_suffix('_Media'), ewma.add_suffix('_EWMA')], axis=1)
+    return suavizado.reindex(df.index)
+
+# ==============================================================================
+# 3. PROJEÇÃO DA DATA DA META
+# ==============================================================================
+def _retas(codigos, t, y, usar, n_pessoas):
+    """Mínimos quadrados de y em t por pessoa, com somas de np.bincount (n, Σt, Σy, Σt², Σty).
+
+    Devolve n, inclinação (por dia), valor da reta em t = 0 e se a reta está definida.
+    """
+    usar = usar & ~np.isnan(y)
+
+    def soma(valores):
+        return np.bincount(codigos[usar], weights=valores[usar], minlength=n_pessoas)
+
+    n = np.bincount(codigos[usar], minlength=n_pessoas).astype(float)
+    st_, sy, stt, sty = soma(t), soma(y), soma(t * t), soma(t * y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominador = n * stt - st_ * st_
+        inclinacao = (n * sty - st_ * sy) / denominador
+        intercepto = (sy - inclinacao * st_) / n
+    return n, inclinacao, intercepto, (n >= MIN_PONTOS_PROJECAO) & (denominador > 0)
+
+def _ultimas(codigos, datas):
+    """Ordem por (pessoa, data) e posição (nessa ordem) da última medição de cada pessoa."""
+    ordem = np.lexsort((datas, codigos))
+    fim = np.r_[np.flatnonzero(codigos[ordem][1:] != codigos[ordem][:-1]), len(ordem) - 1]
+    return ordem, fim
+
+def projetar_metas(df, metas):
+    """Tendência do peso e data prevista para a meta de cada pessoa (uma linha por pessoa).
+
+    A reta de cada pessoa sai de somas acumuladas com np.bincount (_retas), então todas
+    as regressões são resolvidas de uma vez. Status: 'sem_meta', 'atingida' (pela reta ou,
+    sem reta, pela última pesagem), 'poucos_dados', 'projetada', 'estavel' (ritmo abaixo
+    de RITMO_ESTAVEL_KG_SEMANA), 'longe' (na direção certa, mas além de
+    HORIZONTE_MAXIMO_DIAS) ou 'tendencia_contraria' (o peso está se afastando da meta).
+    """
+    validos = df[df['Data'].notna() & df['Pessoa'].notna()]
+    codigos, pessoas = pd.factorize(validos['Pessoa'], sort=True)
+    pessoas = np.asarray(pessoas, dtype=object)
+    n_pessoas = len(pessoas)
+    datas = validos['Data'].to_numpy(dtype='datetime64[ns]')
+    peso = dados.valores_float64(validos['Peso'])
+
+    # Última medição de cada pessoa e a janela da regressão
+    ultima = np.full(n_pessoas, np.datetime64('NaT', 'ns'))
+    ultimo_peso = np.full(n_pessoas, np.nan)
+    if len(codigos):
+        ordem, fim = _ultimas(codigos, datas)
+        ultima = datas[ordem][fim]
+        ultimo_peso = pd.Series(peso[ordem]).groupby(codigos[ordem]).last().reindex(range(n_pessoas)).to_numpy()
+    t = (datas - ultima[codigos]) / np.timedelta64(1, 'D')  # dias até a última medição (<= 0)
+    # kg por dia e valor da reta na última medição
+    n, inclinacao, peso_tendencia, suficiente = _retas(codigos, t, peso, t >= -JANELA_PROJECAO_DIAS, n_pessoas)
+
+    meta = pd.Series(pessoas).map(metas).to_numpy(dtype=float)
+    falta = meta - np.where(suficiente, peso_tendencia, ultimo_peso)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dias = falta / inclinacao
+    atingida = np.abs(falta) <= TOLERANCIA_META_KG
+    projetada = suficiente & ~atingida & (dias > 0) & (dias <= HORIZONTE_MAXIMO_DIAS)
+    estavel = np.abs(inclinacao * 7) < RITMO_ESTAVEL_KG_SEMANA
+
+    status = np.select(
+        [np.isnan(meta), atingida, ~suficiente, projetada, estavel, dias > HORIZONTE_MAXIMO_DIAS],
+        ['sem_meta', 'atingida', 'poucos_dados', 'projetada', 'estavel', 'longe'], default='tendencia_contraria')
+    data_prevista = ultima + np.where(projetada, dias, np.nan) * np.timedelta64(86400, 's')
+
+    return pd.DataFrame({
+        'Meta_Peso': meta,
+        'Peso_Tendencia': np.where(suficiente, peso_tendencia, np.nan),
+        'Kg_por_Semana': np.where(suficiente, inclinacao * 7, np.nan),
+        'Data_Prevista': pd.to_datetime(data_prevista).normalize(),
+        'Status': status,
+    }, index=pd.Index(pessoas, name='Pessoa'))
+
+# ==============================================================================
+# 4. CACHE POR VERSÃO DOS DADOS
+# ==============================================================================
+@st.cache_resource(max_entries=2 * dados.MAX_BANCOS_CARREGADOS)
+def analise_em_cache(_df, versao, banco=dados.ARQUIVO_BANCO, versao_metas=0):
+    """Séries suavizadas e projeções de todos os membros, uma vez por versão dos dados e das metas."""
+    return Analise(suavizar(_df), projetar_metas(_df, dados.carregar_metas(banco)))
+
+# ==============================================================================
+# 5. RESUMO DO HISTÓRICO PARA A IA
+# ==============================================================================
+def resumir_membros(df, suavizado, ranking_df):
+    """Uma linha por pessoa com o resumo do histórico que vai no prompt do assistente.
+
+    Para cada métrica suavizada: valor atual da EWMA, tendência por semana (reta dos
+    últimos JANELA_PROJECAO_DIAS dias) e variação em cada JANELAS_VARIACAO_DIAS; mais
+    o Indicador e a posição no ranking de todo o período. Tudo em lote, sem laço por membro.
+    """
+    validos = df[df['Data'].notna() & df['Pessoa'].notna()]
+    codigos, pessoas = pd.factorize(validos['Pessoa'], sort=True)
+    n_pessoas = len(pessoas)
+    datas = validos['Data'].to_numpy(dtype='datetime64[ns]')
+    resumo = pd.DataFrame(index=pd.Index(np.asarray(pessoas, dtype=object), name='Pessoa'))
+    if not n_pessoas: return resumo
+
+    ordem, fim = _ultimas(codigos, datas)
+    ultima = datas[ordem][fim]
+    t = (datas - ultima[codigos]) / np.timedelta64(1, 'D')
+    resumo['Medicoes'] = np.bincount(codigos, minlength=n_pessoas)
+    resumo['Ultima_Data'] = ultima
+
+    # Primeira medição (na ordem por pessoa e data) dentro de cada janela
+    primeiros = {}
+    for dias in JANELAS_VARIACAO_DIAS:
+        dentro = np.flatnonzero(t[ordem] >= -dias)
+        _, primeira = np.unique(codigos[ordem][dentro], return_index=True)
+        primeiros[dias] = dentro[primeira]
+
+    ewma = suavizado.loc[validos.index]
+    for m in METRICAS_SUAVIZADAS:
+        y = dados.valores_float64(validos[m])
+        _, inclinacao, _, suficiente = _retas(codigos, t, y, t >= -JANELA_PROJECAO_DIAS, n_pessoas)
+        resumo[f'{m}_Atual'] = ewma[f'{m}_EWMA'].to_numpy()[ordem][fim]
+        resumo[f'{m}_Semana'] = np.where(suficiente, inclinacao * 7, np.nan)
+        for dias, primeiro in primeiros.items():
+            variacao = y[ordem][fim] - y[ordem][primeiro]
+            resumo[f'{m}_{dias}d'] = np.where(primeiro < fim, variacao, np.nan)  # uma medição só: sem variação
+
+    indicador = ranking_df.set_index('Pessoa')['Indicador']
+    resumo['Indicador'] = indicador.reindex(resumo.index)
+    resumo['Posicao'] = indicador.rank(ascending=False, method='min').reindex(resumo.index)
+    resumo.attrs['membros'] = int(indicador.notna().sum())
+    return resumo
+
+@st.cache_resource(max_entries=2 * dados.MAX_BANCOS_CARREGADOS)
+def resumo_em_cache(_df, versao, banco=dados.ARQUIVO_BANCO, versao_metas=0):
+    """resumir_membros() de todos os membros, uma vez por versão dos dados (e das metas)."""
+    todo_periodo = ranking.ranking_da_janela(_df, versao, ranking.Janela(), banco)
+    return resumir_membros(_df, analise_em_cache(_df, versao, banco, versao_metas).suavizado, todo_periodo)
+
+def texto_resumo(resumo, pessoa, projecao=None):
+    """Texto de tamanho fixo (uma linha por item, ~100 tokens) do resumo de uma pessoa."""
+    if pessoa not in resumo.index: return ""
+    linha = resumo.loc[pessoa]
+
+    def numero(valor, formato):
+        return format(valor, formato) if pd.notna(valor) else "s/d"
+
+    texto = [f"Histórico: {int(linha['Medicoes'])} medições, última em {linha['Ultima_Data']:%d/%m/%Y}."]
+    for m, (nome, unidade) in NOMES_RESUMO.items():
+        variacoes = ", ".join(f"{dias} dias {numero(linha[f'{m}_{dias}d'], '+.1f')}" for dias in JANELAS_VARIACAO_DIAS)
+        texto.append(f"- {nome}: atual (suavizado) {numero(linha[f'{m}_Atual'], '.1f')}, "
+                     f"tendência {numero(linha[f'{m}_Semana'], '+.2f')} {unidade}/semana, variação {variacoes}.")
+    texto.append(f"- Indicador do ranking: {numero(linha['Indicador'], '+.1f')} "
+                 f"(posição {numero(linha['Posicao'], '.0f')} de {resumo.attrs.get('membros', len(resumo))}).")
+    if projecao is not None and pd.notna(projecao['Meta_Peso']):
+        previsao = (f"{projecao['Data_Prevista']:%d/%m/%Y}" if pd.notna(projecao['Data_Prevista'])
+                    else SITUACAO_META.get(projecao['Status'], projecao['Status']))
+        texto.append(f"- Meta de peso: {projecao['Meta_Peso']:.1f} kg (previsão: {previsao}).")
+    return "\n".join(texto)
+
+def texto_faixas(resumo, pessoa, projecao=None):
+    """Resumo em faixas, sem valores exatos, posição ou datas (só sentido e ordem de grandeza).
+
+    Vai no prompt da primeira pergunta e na chave do cache de respostas: membros com
+    históricos parecidos compartilham a resposta, que não cita nada só de um deles.
+    """
+    if pessoa not in resumo.index: return ""
+    linha = resumo.loc[pessoa]
+
+    def faixa(valor, largura, unidade=""):
+        if pd.isna(valor): return "s/d"
+        inicio = np.floor(valor / largura) * largura + 0.0  # sem -0.00
+        return f"entre {inicio:+.2f} e {inicio + largura:+.2f}{unidade}"
+
+    def sentido(valor):
+        if pd.isna(valor): return "s/d"
+        return "estável" if abs(valor) < VARIACAO_ESTAVEL else ("em alta" if valor > 0 else "em queda")
+
+    texto = []
+    for m, (nome, unidade) in NOMES_RESUMO.items():
+        texto.append(f"- {nome}: tendência {faixa(linha[f'{m}_Semana'], LARGURA_TENDENCIA, f' {unidade}/semana')}, "
+                     f"{sentido(linha[f'{m}_{JANELAS_VARIACAO_DIAS[-1]}d'])} em {JANELAS_VARIACAO_DIAS[-1]} dias.")
+    texto.append(f"- Indicador do ranking: {faixa(linha['Indicador'], LARGURA_INDICADOR)}.")
+    if projecao is not None and pd.notna(projecao['Meta_Peso']):
+        texto.append(f"- Meta de peso: {SITUACAO_META.get(projecao['Status'], projecao['Status'])}.")
+    return "\n".join(texto)
@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+import dados
+
+# ==============================================================================
+# 1. PARÂMETROS
+# ==============================================================================
+# A bioimpedância varia com hidratação, sono e alimentação (ver regulamento.py): uma
+# leitura fora da curva da própria pessoa distorce o Indicador. Só as métricas que
+# entram no Indicador são avaliadas.
+METRICAS = ["Peso", "Perc_Gordura", "Perc_Musc", "Visceral"]
+NOMES = {"Peso": "Peso", "Perc_Gordura": "% Gordura", "Perc_Musc": "% Músculo", "Visceral": "Visceral"}
+
+# z-score robusto (Iglewicz e Hoaglin): 0,6745 * (x - mediana) / MAD, suspeito acima de 3,5
+LIMITE_Z = 3.5
+# Com menos variações que isso a pessoa ainda não tem histórico para comparar
+MIN_VARIACOES = 4
+# Piso do MAD (na unidade da métrica): quem varia sempre igual não vira suspeito por 0,1
+MAD_MINIMO = {"Peso": 0.2, "Perc_Gordura": 0.2, "Perc_Musc": 0.2, "Visceral": 0.5}
+
+# ==============================================================================
+# 2. DETECÇÃO VETORIZADA
+# ==============================================================================
+def analisar(df):
+    """Tabela booleana (mesmo índice de df, uma coluna por métrica) das leituras suspeitas.
+
+    Uma passada sobre o histórico inteiro, com groupby por pessoa (sem laço). Para cada
+    métrica, a variação até cada medição é comparada com a mediana/MAD das variações da
+    própria pessoa. A medição é suspeita quando o salto até ela é atípico e a variação
+    seguinte também é, no sentido oposto (pico que volta), ou quando ela é a última da
+    pessoa (ainda sem confirmação) e atípica. Se a penúltima for um pico que volta, a
+    última é comparada com a medição de antes do pico: a volta ao normal não é marcada.
+    Uma mudança de patamar que se mantém não é marcada.
+    """
+    if df.empty: return pd.DataFrame(False, index=df.index, columns=METRICAS)
+
+    # Sem data não há ordem: a medição fica fora da análise
+    ordenado = df[df['Data'].notna()].sort_values(['Pessoa', 'Data'], kind='stable')
+    codigos = pd.factorize(ordenado['Pessoa'])[0]
+    valores = pd.DataFrame({m: dados.valores_float64(ordenado[m]) for m in METRICAS}, index=ordenado.index)
+
+    variacao = valores.groupby(codigos).diff()
+    por_pessoa = variacao.groupby(codigos)
+    mediana = por_pessoa.transform('median')
+    mad = (variacao - mediana).abs().groupby(codigos).transform('median')
+    mad = np.maximum(mad, [MAD_MINIMO[m] for m in METRICAS])
+    z = 0.6745 * (variacao - mediana) / mad
+
+    historico_suficiente = (por_pessoa.transform('count') >= MIN_VARIACOES).to_numpy()
+    atipico = (z.abs() > LIMITE_Z) & historico_suficiente
+    z_seguinte = z.groupby(codigos).shift(-1)
+    volta = (z_seguinte.abs() > LIMITE_Z) & (np.sign(z_seguinte) != np.sign(z))
+    pico = atipico & volta
+    ultima = np.r_[codigos[1:] != codigos[:-1], True]
+
+    # Última medição depois de um pico: variação desde a medição anterior ao pico (dois passos)
+    z_dois_passos = 0.6745 * (valores.groupby(codigos).diff(2) - 2 * mediana) / (mad * np.sqrt(2))
+    depois_de_pico = pico.groupby(codigos).shift(1, fill_value=False).astype(bool)
+    z_ultima = z.mask(depois_de_pico, z_dois_passos)
+    ultima_atipica = (z_ultima.abs() > LIMITE_Z) & historico_suficiente & ultima[:, None]
+
+    suspeitas = pico | ultima_atipica
+    return suspeitas.reindex(df.index, fill_value=False)
+
+def suspeitas(df):
+    """Série booleana: a medição tem ao menos uma métrica suspeita."""
+    return analisar(df).any(axis=1)
+
+@st.cache_resource(max_entries=2 * dados.MAX_BANCOS_CARREGADOS)
+def analise_em_cache(_df, versao, banco=dados.ARQUIVO_BANCO):
+    """analisar() do histórico completo, uma vez por versão dos dados do grupo."""
+    return analisar(_df)
+
+def motivos(linha):
+    """Nomes das métricas marcadas numa linha de analisar()."""
+    return [NOMES[m] for m in METRICAS if linha[m]]
+
+# ==============================================================================
+# 3. CHECAGEM NA ENTRADA
+# ==============================================================================
+def avaliar_medicao(historico, data):
+    """Métricas suspeitas da medição de `data` dentro do histórico (já gravado) da pessoa."""
+    analise = analisar(historico)
+    da_data = analise[(historico['Data'] == pd.Timestamp(data)).to_numpy()]
+    return motivos(da_data.any()) if not da_data.empty else []
@@ -12,13 +12,26 @@ import requests
 from streamlit_lottie import st_lottie 
 from streamlit_option_menu import option_menu
 
-import assistente_ia
+# assistente_ia e nutri_vision (Gemini, FPDF, PIL) só são importados nas telas que os usam
+import agregados
+import analises
+import anomalias
+import cache_ia
+import cliente_ia
+import dados
 import hub_conteudo
-import nutri_vision 
+import graficos
+import grupos
+import importacao
+import perfil
+import ranking
 import regulamento
 
 st.set_page_config(page_title="Health Tracker | DPJ", page_icon="🩺", layout="wide")
 
+# Perfil por execução (perfil.py): marcos ao fim de cada seção; sem custo quando desligado
+execucao = perfil.iniciar(st.session_state.get('perfil_ativo', False))
+
 # ==============================================================================
 # 2. CSS CUSTOMIZADO (O "PULO DO GATO" PARA O DESIGN MODERNO)
 # ==============================================================================
@@ -141,27 +154,15 @@ st.markdown("""
     
 </style>
 """, unsafe_allow_html=True)
+execucao.marco("CSS")
 
 
 
 # ==============================================================================
 # 3. FUNÇÕES DE SUPORTE (DADOS E ANIMAÇÃO)
 # ==============================================================================
-DATA_FILE = "Série histórica das medições - Grupo DPJ.xlsx"
-
-def load_data():
-    if not os.path.exists(DATA_FILE): return pd.DataFrame()
-    try: return pd.read_excel(DATA_FILE, engine='openpyxl')
-    except: return pd.DataFrame()
-
-def save_data(df):
-    try:
-        df.to_excel(DATA_FILE, index=False, engine='openpyxl')
-        return True
-    except PermissionError:
-        st.error("⚠️ O arquivo Excel está ABERTO! Feche-o para salvar.")
-        return False
-
+# Armazenamento (SQLite) e o cache compartilhado entre sessões ficam em dados.py
+from dados import carregar_com_versao, inserir_medicao
 
 
 def render_modern_metric(label, value, delta_val, suffix="", is_good_up=True, sftg="",target=""):
@@ -193,17 +194,23 @@ def render_modern_metric(label, value, delta_val, suffix="", is_good_up=True, sf
     """, unsafe_allow_html=True)
     
 
-df = load_data()
-if 'Data' in df.columns: df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+# Cada grupo tem o próprio banco e as próprias senhas (grupos.py)
+GRUPOS = grupos.carregar_grupos()
+grupo = grupos.grupo_da_sessao(GRUPOS)
+df, versao_dados = carregar_com_versao(grupo.banco, grupo.planilha)
+indice = dados.indice_pessoas(df, versao_dados, grupo.banco)
+execucao.marco("Carga de dados")
 
 # ==============================================================================
 # 4. SISTEMA DE LOGIN (COM POPUP)
 # ==============================================================================
+USUARIOS = grupo.usuarios
+
 try:
-    USUARIOS = st.secrets["passwords"]
+    INICIO_COMPETICAO = pd.Timestamp(grupo.inicio_competicao or st.secrets["inicio_competicao"])
 except:
-    # Fallback apenas para não quebrar se você esquecer de configurar localmente
-    USUARIOS = {"admin": "admin123"}
+    # Sem data configurada, a competição começa na primeira medição registrada
+    INICIO_COMPETICAO = df['Data'].min() if not df.empty else None
 
 if 'logado' not in st.session_state: st.session_state['logado'] = False
 if 'usuario_atual' not in st.session_state: st.session_state['usuario_atual'] = ""
@@ -233,7 +240,10 @@ def logout():
 # ==============================================================================
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/3004/3004458.png", width=80)
-    st.markdown("### Painel Saúde DPJ")
+    st.markdown(f"### Painel Saúde {grupo.nome}")
+    if len(GRUPOS) > 1:
+        st.selectbox("Grupo:", list(GRUPOS), key='grupo', format_func=lambda chave: GRUPOS[chave].nome,
+                     on_change=grupos.trocar_grupo)
     st.markdown("---")
     
     if not st.session_state['logado']:
@@ -241,25 +251,32 @@ with st.sidebar:
     else:
         st.success(f"Olá, {st.session_state['usuario_atual'].capitalize()}!")
         if st.button("Sair"): logout()
+        if st.button("📤 Exportar Excel"): st.session_state['exportacao'] = dados.exportar_excel(grupo.banco)
+        if 'exportacao' in st.session_state:
+            st.download_button("⬇️ Baixar planilha", st.session_state['exportacao'], file_name=os.path.basename(grupo.planilha or f"{grupo.chave}.xlsx"),
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+        if st.session_state['usuario_atual'] == "admin": importacao.exibir_importacao(grupo.banco)
+        # Preenchido no fim do script, quando os números desta execução já existem
+        painel_desempenho = st.container()
     
     st.markdown("---")
     
-    if not df.empty and 'Pessoa' in df.columns:
-        pessoas = df['Pessoa'].unique()
-        selected_person = st.selectbox("Visualizar Membro:", pessoas)
+    if indice.pessoas:
+        selected_person = st.selectbox("Visualizar Membro:", indice.pessoas)
     else:
         selected_person = "Ninguém"
+execucao.marco("Login e sidebar")
 
 # ==============================================================================
 # 6. MENU E ANIMAÇÃO DE TRANSIÇÃO
 # ==============================================================================
 
 if st.session_state['logado']:
-    opcoes = ["Individual", "Ranking", "Dicas", "Assistente IA", "Nutri-Vision","Regulamento"]
-    icones = ["person-circle", "trophy-fill", "lightbulb", "robot", "camera-fill","clipboard"]
+    opcoes = ["Individual", "Ranking", "Grupo", "Dicas", "Assistente IA", "Nutri-Vision","Regulamento"]
+    icones = ["person-circle", "trophy-fill", "people-fill", "lightbulb", "robot", "camera-fill","clipboard"]
 else:
-    opcoes = ["Individual", "Ranking","Regulamento"]
-    icones = ["person-circle", "trophy-fill","clipboard"]
+    opcoes = ["Individual", "Ranking", "Grupo","Regulamento"]
+    icones = ["person-circle", "trophy-fill", "people-fill","clipboard"]
 
 selected = option_menu(
     menu_title=None,
@@ -275,6 +292,7 @@ selected = option_menu(
         "nav-link-selected": {"background-color": "#ff4b4b"},
     }
 )
+execucao.marco("Menu")
 
 
     
@@ -282,10 +300,209 @@ selected = option_menu(
 # 7. LÓGICA DAS TELAS
 # ==============================================================================
 
-# Prepara dados
-df_person = df[df['Pessoa'] == selected_person].sort_values(by="Data") if not df.empty else pd.DataFrame()
-ultimo_registro = {}
-if not df_person.empty: ultimo_registro = df_person.iloc[-1].to_dict()
+# Trechos com rerun parcial (st.fragment): interagir com eles reexecuta só a própria
+# função, sem CSS, carga de dados, sidebar e menu. Os argumentos são os da última
+# execução completa do app.
+
+@st.fragment
+def formulario_medicao(pessoa, ultimo_registro):
+    with st.expander("📝 Nova Medição (Acesso Restrito)", expanded=False):
+        with st.form("entry_form"):
+            date_input = st.date_input("Data", datetime.today())
+            col_f1, col_f2 = st.columns(2)
+
+            def get_v(k, d): return float(ultimo_registro[k]) if k in ultimo_registro else d
+
+            with col_f1:
+                peso = st.number_input("Peso (kg)", value=get_v('Peso', 70.0))
+                gordura = st.number_input("% Gordura", value=get_v('Perc_Gordura', 20.0))
+                visc = st.number_input("Visceral", value=get_v('Visceral', 5.0))
+                imc_val = st.number_input("IMC", value=get_v('IMC', 24.0))
+            with col_f2:
+                musc = st.number_input("% Músculo", value=get_v('Perc_Musc', 30.0))
+                rm = st.number_input("Taxa Metabólica", value=int(get_v('RM', 1500)))
+                idade = st.number_input("Idade", value=int(get_v('Idade', 30)))
+
+            if st.form_submit_button("💾 Salvar Dados", use_container_width=True):
+                new_data = {
+                    "Pessoa": pessoa, "Data": pd.to_datetime(date_input),
+                    "Peso": peso, "IMC": imc_val, "Perc_Gordura": gordura, 
+                    "Perc_Musc": musc, "RM": rm, "Idade": idade, "Visceral": visc
+                }
+                nova_versao = inserir_medicao(new_data, grupo.banco)
+                if nova_versao:
+                    # Só a linha desta pessoa é recalculada nos rankings em memória
+                    historico = dados.carregar_pessoa(pessoa, grupo.banco)
+                    ranking.registrar_medicao(historico, pessoa, nova_versao - 1, nova_versao, grupo.banco)
+                    agregados.registrar_medicao(new_data, nova_versao - 1, nova_versao, grupo.banco)
+                    st.success("Salvo! Recarregue a página.")
+                    suspeitas = anomalias.avaliar_medicao(historico, new_data["Data"])
+                    if suspeitas:
+                        st.warning(f"⚠️ Variação fora do padrão em: {', '.join(suspeitas)}. Confira os valores; "
+                                   "hidratação, sono e alimentação alteram a bioimpedância.")
+
+@st.fragment
+def formulario_meta(pessoa, meta_atual):
+    with st.expander("🎯 Meta de Peso", expanded=False):
+        with st.form("meta_form"):
+            meta = st.number_input("Meta (kg)", min_value=30.0, max_value=250.0,
+                                   value=float(meta_atual) if pd.notna(meta_atual) else 70.0, step=0.5)
+            c_salvar, c_remover = st.columns(2)
+            salvar = c_salvar.form_submit_button("💾 Salvar Meta", use_container_width=True)
+            remover = c_remover.form_submit_button("Remover Meta", use_container_width=True)
+            if (salvar or remover) and dados.salvar_meta(pessoa, meta if salvar else None, grupo.banco):
+                st.success("Meta salva! Recarregue a página." if salvar else "Meta removida! Recarregue a página.")
+
+@st.fragment
+def tela_ranking(df, versao_dados):
+    # Seletor de janela centralizado
+    janelas = {
+        "Todo o Período": ranking.Janela(),
+        "Últimos 7 Dias": ranking.Janela(dias=7),
+        "Últimos 30 Dias": ranking.Janela(dias=30),
+        "Últimos 90 Dias": ranking.Janela(dias=90),
+        "Últimos 100 Dias": ranking.Janela(dias=100),
+        "Desde o Início da Competição": ranking.Janela(inicio=INICIO_COMPETICAO),
+        "Período Personalizado": None,
+    }
+    _, col_toggle, _ = st.columns([1, 1, 1])
+    with col_toggle:
+        periodo_texto = st.selectbox("Período:", list(janelas))
+        sem_suspeitas = st.toggle("Ignorar medições suspeitas",
+                                  help="Deixa de fora leituras fora da curva da própria pessoa (picos de bioimpedância).")
+        janela = janelas[periodo_texto]
+        if janela is None:
+            intervalo = st.date_input("Intervalo:", (df['Data'].min(), df['Data'].max()), format="DD/MM/YYYY")
+            if len(intervalo) < 2: return  # aguardando a data final
+            janela = ranking.Janela(inicio=pd.Timestamp(intervalo[0]), fim=pd.Timestamp(intervalo[1]))
+            periodo_texto = f"{intervalo[0]:%d/%m/%Y} a {intervalo[1]:%d/%m/%Y}"
+
+    st.divider()
+
+    # Ranking vetorizado (ranking.py), em cache por (versão dos dados, janela)
+    ranking_df = ranking.ranking_da_janela(df, versao_dados, janela, grupo.banco, sem_suspeitas)
+    if ranking_df.empty:
+        st.warning("Nenhuma medição no período selecionado.")
+        return
+
+    # Legenda informativa
+    data_min = ranking_df['Data_Referencia'].min().strftime('%d/%m/%Y')
+    st.caption(f"📊 Comparando dados atuais com a base de: **{data_min}**")
+
+    # --- PÓDIO ---
+    st.subheader(f"🔥 Top Evolução do Indicador ({periodo_texto})")
+    top_indicador = ranking_df.sort_values("Indicador", ascending=False).head(3)
+    cols = st.columns(3)
+    medalhas = ["🥇", "🥈", "🥉"]
+    classes = ["first-place", "second-place", "third-place"] # Classes CSS que definimos antes
+
+    for i, (idx, row) in enumerate(top_indicador.iterrows()):
+        with cols[i]:
+            # Card de pódio com cores de metal
+            st.markdown(f"""
+                <div class="ranking-card {classes[i] if i < len(classes) else ''}">
+                    <span class="medal">{medalhas[i]}</span>
+                    <div class="ranking-name">{row['Pessoa']}</div>
+                    <div class="ranking-value"> {max(0, row['Indicador']):.1f} pontos</div>
+                    <div style="color: #64748B; font-size: 0.8rem;">Evolução no período</div>
+                </div>
+            """, unsafe_allow_html=True)
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # --- TABELAS E MAPA ---
+    col_g1, col_g2 = st.columns(2)
+    with col_g1:
+        st.markdown(f"### 🥓 Foco: Perda de Gordura ({periodo_texto})")
+        gord_df = ranking_df.sort_values("Perda_Gordura", ascending=False)[['Pessoa', 'Perda_Gordura']]
+        st.dataframe(gord_df.rename(columns={'Perda_Gordura': 'Eliminado (%)'}).style.background_gradient(cmap="Greens").format("{:.2f}", subset=['Eliminado (%)']),hide_index=True, use_container_width=True)
+
+    with col_g2:
+        st.markdown(f"### 💪 Foco: Ganho de Massa Magra ({periodo_texto})")
+        massa_df = ranking_df.sort_values("Ganho_Musculo", ascending=False)[['Pessoa', 'Ganho_Musculo']]
+        st.dataframe(massa_df.rename(columns={'Ganho_Musculo': 'Ganho (%)'}).style.background_gradient(cmap="Greens").format("{:.2f}", subset=['Ganho (%)']),hide_index=True, use_container_width=True)
+    st.divider()
+    st.markdown(f"### 🗺️ Mapa de Resultados ({periodo_texto})")
+    fig_mapa = px.scatter(ranking_df, x="Ganho_Musculo", y="Perda_Gordura", text="Pessoa", 
+                          size="Peso_Atual", color="Pessoa", template="plotly_white")
+    fig_mapa.update_layout(margin=dict(t=0, b=0))
+    st.plotly_chart(fig_mapa, use_container_width=True)
+
+    # --- EVOLUÇÃO DAS POSIÇÕES ---
+    st.divider()
+    st.markdown("### 📈 Evolução do Ranking (Todo o Período)")
+    _, posicoes = ranking.trajetoria_em_cache(df, versao_dados, grupo.banco)
+    if len(posicoes) > 1:
+        # Com muitos membros o gráfico fica ilegível: mostra os 10 primeiros de hoje
+        lideres = posicoes.iloc[-1].nsmallest(10).index
+        linhas = posicoes[lideres].reset_index().melt(id_vars='Data', var_name='Pessoa', value_name='Posição').dropna()
+        fig_evolucao = px.line(linhas, x="Data", y="Posição", color="Pessoa", markers=True, template="plotly_white")
+        fig_evolucao.update_yaxes(autorange="reversed", dtick=1)
+        fig_evolucao.update_layout(margin=dict(t=0, b=0))
+        st.plotly_chart(fig_evolucao, use_container_width=True)
+    else:
+        st.caption("A evolução aparece a partir da segunda data de medição do grupo.")
+
+@st.fragment
+def tela_grupo(df, versao_dados):
+    # Agregados mensais mantidos a cada inserção (agregados.py): a tela não relê o histórico
+    tabela = agregados.agregados_do_grupo(df, versao_dados, grupo.banco)
+    nomes = {"Peso": "Peso (kg)", "Perc_Gordura": "% Gordura", "Perc_Musc": "% Músculo", "Visceral": "Visceral"}
+    _, col_metrica, _ = st.columns([1, 1, 1])
+    with col_metrica:
+        metrica = st.selectbox("Métrica:", agregados.METRICAS, format_func=nomes.get)
+    estat = tabela.estatisticas(metrica)
+    if estat.empty:
+        st.warning("Nenhuma medição registrada.")
+        return
+
+    atual, mes_atual = estat.iloc[-1], estat.index[-1].strftime('%m/%Y')
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Membros", len(indice.pessoas))
+    k2.metric("Medições", f"{tabela.medicoes:,}".replace(",", "."))
+    k3.metric(f"Média ({mes_atual})", f"{atual['Média']:.1f}",
+              f"{atual['Média'] - estat['Média'].iloc[-2]:+.2f}" if len(estat) > 1 else None, delta_color="off")
+    k4.metric(f"Mediana ({mes_atual})", f"{atual['P50']:.1f}")
+    st.divider()
+
+    st.markdown(f"### 📈 {nomes[metrica]} ao longo do tempo")
+    meses = estat.index.to_timestamp()
+    fig_tempo = go.Figure()
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["P75"], line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["P25"], name="P25–P75", fill='tonexty', line=dict(width=0),
+                                   fillcolor='rgba(59, 130, 246, 0.15)'))
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["P50"], name="Mediana", line=dict(color='#3B82F6', width=3)))
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["Média"], name="Média", line=dict(color='#1E293B', dash='dash')))
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["P10"], name="P10", line=dict(color='#94A3B8', dash='dot')))
+    fig_tempo.add_trace(go.Scatter(x=meses, y=estat["P90"], name="P90", line=dict(color='#94A3B8', dash='dot')))
+    fig_tempo.update_layout(plot_bgcolor='white', margin=dict(t=0, b=0))
+    st.plotly_chart(fig_tempo, use_container_width=True)
+
+    col_d1, col_d2 = st.columns(2)
+    with col_d1:
+        st.markdown("### 📊 Distribuição (últimos 3 meses)")
+        distribuicao = tabela.distribuicao(metrica, ultimos_meses=3)
+        fig_dist = px.bar(x=distribuicao.index, y=distribuicao.values, labels={"x": nomes[metrica], "y": "Medições"},
+                          template="plotly_white", color_discrete_sequence=['#8B5CF6'])
+        fig_dist.update_layout(margin=dict(t=0, b=0), bargap=0.05)
+        st.plotly_chart(fig_dist, use_container_width=True)
+    with col_d2:
+        st.markdown("### 🗓️ Resumo mensal")
+        resumo = estat.iloc[::-1].copy()
+        resumo.index = resumo.index.strftime('%m/%Y')
+        st.dataframe(resumo.round(2), use_container_width=True)
+    st.caption(f"Percentis exatos nos meses com até {agregados.MAX_EXATO} medições; nos demais, estimados por "
+               f"histograma com faixas de {agregados.FAIXAS[metrica][2]:g} em {nomes[metrica]}.")
+
+# Prepara dados (consultas ao índice por pessoa, sem varrer o frame inteiro)
+economia_figuras = 0.0
+df_person = indice.historico(selected_person)
+ultimo_registro = indice.ultimo_registro(selected_person)
+# Médias móveis e projeções de todos os membros, calculadas uma vez por versão dos dados
+versao_metas = dados.versao_metas(grupo.banco)
+analise = analises.analise_em_cache(df, versao_dados, grupo.banco, versao_metas)
+projecao = analise.projecao.loc[selected_person] if selected_person in analise.projecao.index else None
+meta_peso = projecao['Meta_Peso'] if projecao is not None and pd.notna(projecao['Meta_Peso']) else None
 
 # --- TELA 1: INDIVIDUAL ---
 if selected == "Individual":
@@ -293,31 +510,8 @@ if selected == "Individual":
     
     # SÓ MOSTRA O FORMULÁRIO SE ESTIVER LOGADO
     if st.session_state['logado']:
-        with st.expander("📝 Nova Medição (Acesso Restrito)", expanded=False):
-            with st.form("entry_form"):
-                date_input = st.date_input("Data", datetime.today())
-                col_f1, col_f2 = st.columns(2)
-                
-                def get_v(k, d): return float(ultimo_registro[k]) if k in ultimo_registro else d
-                
-                with col_f1:
-                    peso = st.number_input("Peso (kg)", value=get_v('Peso', 70.0))
-                    gordura = st.number_input("% Gordura", value=get_v('Perc_Gordura', 20.0))
-                    visc = st.number_input("Visceral", value=get_v('Visceral', 5.0))
-                    imc_val = st.number_input("IMC", value=get_v('IMC', 24.0))
-                with col_f2:
-                    musc = st.number_input("% Músculo", value=get_v('Perc_Musc', 30.0))
-                    rm = st.number_input("Taxa Metabólica", value=int(get_v('RM', 1500)))
-                    idade = st.number_input("Idade", value=int(get_v('Idade', 30)))
-                
-                if st.form_submit_button("💾 Salvar Dados", use_container_width=True):
-                    new_data = {
-                        "Pessoa": selected_person, "Data": pd.to_datetime(date_input),
-                        "Peso": peso, "IMC": imc_val, "Perc_Gordura": gordura, 
-                        "Perc_Musc": musc, "RM": rm, "Idade": idade, "Visceral": visc
-                    }
-                    df = pd.concat([df, pd.DataFrame([new_data])], ignore_index=True)
-                    if save_data(df): st.success("Salvo! Recarregue a página.")
+        formulario_medicao(selected_person, ultimo_registro)
+        formulario_meta(selected_person, meta_peso)
     else:
         st.info("Faça login na barra lateral para cadastrar novas medições.",icon="🔐")
 
@@ -328,164 +522,131 @@ if selected == "Individual":
         # Grid de Métricas Premium
         m1, m2, m3, m4, m5 = st.columns(5)
         with m1:  
-    # Aqui definimos a meta, por exemplo, 70.0kg
-            meta_peso = 70.0 
+            # Meta gravada para a pessoa (tabela `metas`); sem meta, o card não mostra alvo
             render_modern_metric(
             label="Peso", 
             value=f"{curr['Peso']}kg", 
             delta_val=curr['Peso'] - first['Peso'], 
             suffix="kg", 
             is_good_up=False,
-            target=meta_peso,
+            target=f"{meta_peso:g}" if meta_peso is not None else None,
             sftg="kg")
         with m2: render_modern_metric("% Gordura", f"{curr['Perc_Gordura']}%", round(curr['Perc_Gordura']-first['Perc_Gordura'],2), "%", False,sftg="")
         with m3: render_modern_metric("% Músculo", f"{curr['Perc_Musc']}%", round(curr['Perc_Musc']-first['Perc_Musc'],2), "%", True,sftg="")
         with m4: render_modern_metric("Visceral", f"{(curr['Visceral'])}", round(curr['Visceral']-first['Visceral'],2), "", False,sftg="")
         with m5: render_modern_metric("Idade Corp", f"{(curr['Idade'])}", round(curr['Idade']-first['Idade'],2), "a", False,sftg="")
         st.info(f"💡 Os indicadores acima mostram sua evolução total desde a primeira medição em **{first['Data'].strftime('%d/%m/%Y')}**.")
+        if meta_peso is not None:
+            ritmo = f"{projecao['Kg_por_Semana']:+.2f} kg/semana nos últimos {analises.JANELA_PROJECAO_DIAS} dias"
+            if projecao['Status'] == "projetada":
+                st.caption(f"🎯 No ritmo atual ({ritmo}), a meta de {meta_peso:g} kg chega por volta de **{projecao['Data_Prevista']:%d/%m/%Y}**.")
+            elif projecao['Status'] == "atingida":
+                st.caption(f"🎯 Meta de {meta_peso:g} kg atingida!")
+            elif projecao['Status'] == "tendencia_contraria":
+                st.caption(f"🎯 No ritmo atual ({ritmo}), o peso está se afastando da meta de {meta_peso:g} kg.")
+            elif projecao['Status'] == "estavel":
+                st.caption(f"🎯 O peso está estável ({ritmo}); a meta de {meta_peso:g} kg ainda não tem data prevista.")
+            elif projecao['Status'] == "longe":
+                st.caption(f"🎯 No ritmo atual ({ritmo}), a meta de {meta_peso:g} kg levaria mais de "
+                           f"{analises.HORIZONTE_MAXIMO_DIAS // 365} anos.")
+        marcacoes = anomalias.analise_em_cache(df, versao_dados, grupo.banco).loc[df_person.index]
+        suspeitas = [f"{data:%d/%m/%Y} ({', '.join(anomalias.motivos(linha))})"
+                     for data, (_, linha) in zip(df_person['Data'], marcacoes.iterrows()) if linha.any()]
+        if suspeitas:
+            st.warning(f"⚠️ Medições fora do padrão: {'; '.join(suspeitas)}. O Ranking pode ignorá-las.")
         st.divider()
 
-        # Gráficos de Alta Performance
+        # Gráficos de Alta Performance (montados uma vez por pessoa e versão dos dados)
+        figuras, economia_figuras = graficos.figuras_individuais(df_person, selected_person, versao_dados, grupo.banco,
+                                                                   analise.suavizado.loc[df_person.index], projecao, versao_metas)
         g1, g2 = st.columns(2)
         
         with g1:
-            fig_peso = go.Figure()
-            fig_peso.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Peso"], mode='lines+markers',
-                                         line=dict(color='#3B82F6', width=4, shape='spline'),
-                                         fill='tozeroy', fillcolor='rgba(59, 130, 246, 0.1)'))
-            fig_peso.update_layout(title="Tendência de Peso", plot_bgcolor='white', margin=dict(t=40, b=0))
-            st.plotly_chart(fig_peso, use_container_width=True)
+            st.plotly_chart(figuras["peso"], use_container_width=True)
 
         with g2:
-            fig_comp = go.Figure()
-            fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Perc_Gordura"], name="% Gordura", 
-                                         line=dict(color='#EF4444', width=3, shape='spline')))
-            fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Perc_Musc"], name="% Músculo", 
-                                         line=dict(color='#10B981', width=3, shape='spline')))
-            fig_comp.update_layout(title="Composição Corporal", plot_bgcolor='white', margin=dict(t=40, b=0))
-            st.plotly_chart(fig_comp, use_container_width=True)
+            st.plotly_chart(figuras["composicao"], use_container_width=True)
 
         # Indicadores Metabólicos (Gauge IMC)
         st.markdown("### 📌 Fisiologia")
         c_imc, c_rm = st.columns([1, 2])
         
         with c_imc:
-            fig_gauge = go.Figure(go.Indicator(
-                mode="gauge+number", value=curr['IMC'],
-                gauge={'axis': {'range': [15, 40]}, 'bar': {'color': "#1E293B"},
-                       'steps': [{'range': [0, 25], 'color': "#D1FAE5"}, {'range': [25, 30], 'color': "#FEF3C7"}, {'range': [30, 40], 'color': "#FEE2E2"}]}))
-            fig_gauge.update_layout(height=600, title="IMC")
-            st.plotly_chart(fig_gauge, use_container_width=True)
+            st.plotly_chart(figuras["imc"], use_container_width=True)
             
         with c_rm:
-            fig_rm = px.bar(df_person.tail(8), x="Data", y="RM", title="Taxa Metabólica (kcal)", color_discrete_sequence=['#8B5CF6'])
-            fig_rm.update_layout(plot_bgcolor='rgba(0,0,0,0)')
-            st.plotly_chart(fig_rm, use_container_width=True)
+            st.plotly_chart(figuras["rm"], use_container_width=True)
 # --- TELA 2: RANKING ---
 
 elif selected == "Ranking":
     st.markdown("# 🏆 Leaderboard do Grupo")
     
-    if not df.empty:
-        # Centralizando o botão Toggle ON/OFF
-        _, col_toggle, _ = st.columns([1, 1, 1])
-        with col_toggle:
-            modo_30_dias = st.toggle("Modo: Últimos 30 Dias", value=False)
-            periodo_texto = "Últimos 30 Dias" if modo_30_dias else "Todo o Período"
+    if not df.empty: tela_ranking(df, versao_dados)
 
-        st.divider()
-
-        # Lógica de Filtro Corrigida
-        def filtrar_por_periodo(group, trinta_dias):
-            group = group.sort_values('Data')
-            ultimo = group.iloc[-1]
-            if trinta_dias:
-                data_corte = ultimo['Data'] - pd.Timedelta(days=30)
-                # Garante que pega a medição mais antiga dentro do período de 30 dias
-                dados_recentes = group[group['Data'] >= data_corte]
-                primeiro = dados_recentes.iloc[0] if not dados_recentes.empty else group.iloc[0]
-            else:
-                primeiro = group.iloc[0]
-            
-            d_musculo = (ultimo['Perc_Musc'] - primeiro['Perc_Musc']) / primeiro['Perc_Musc']
-            d_gordura = (ultimo['Perc_Gordura'] - primeiro['Perc_Gordura']) / primeiro['Perc_Gordura']
-            d_visceral = (ultimo['Visceral'] - primeiro['Visceral']) / primeiro['Visceral']
-            d_peso = (ultimo['Peso'] - primeiro['Peso']) / primeiro['Peso']
-            indicador = 100*((d_musculo*0.4)+(d_gordura*-0.3)+(d_visceral*-0.2)+(d_peso*-0.1))
-
-            return pd.Series({
-                'Ganho_Musculo': ultimo['Perc_Musc'] - primeiro['Perc_Musc'],
-                'Perda_Gordura': primeiro['Perc_Gordura'] - ultimo['Perc_Gordura'],
-                'Peso_Atual': ultimo['Peso'],
-                'Data_Referencia': primeiro['Data'] ,
-                'Delta_Musculo:': d_musculo,
-                'Delta_Gordura:': d_gordura,
-                'Delta_Visceral:': d_visceral,
-                'Delta_Peso:': d_peso,
-                'Indicador': indicador}
-                )
-    
-                             
-
-        ranking_df = df.sort_values('Data').groupby('Pessoa').apply(
-            filtrar_por_periodo, trinta_dias=modo_30_dias
-        ).reset_index()
-
-        # Legenda informativa
-        data_min = ranking_df['Data_Referencia'].min().strftime('%d/%m/%Y')
-        st.caption(f"📊 Comparando dados atuais com a base de: **{data_min}**")
-
-        # --- PÓDIO ---
-        st.subheader(f"🔥 Top Evolução do Indicador ({periodo_texto})")
-        top_indicador = ranking_df.sort_values("Indicador", ascending=False).head(3)
-        cols = st.columns(3)
-        medalhas = ["🥇", "🥈", "🥉"]
-        classes = ["first-place", "second-place", "third-place"] # Classes CSS que definimos antes
-
-        for i, (idx, row) in enumerate(top_indicador.iterrows()):
-            with cols[i]:
-                # Card de pódio com cores de metal
-                st.markdown(f"""
-                    <div class="ranking-card {classes[i] if i < len(classes) else ''}">
-                        <span class="medal">{medalhas[i]}</span>
-                        <div class="ranking-name">{row['Pessoa']}</div>
-                        <div class="ranking-value"> {max(0, row['Indicador']):.1f} pontos</div>
-                        <div style="color: #64748B; font-size: 0.8rem;">Evolução no período</div>
-                    </div>
-                """, unsafe_allow_html=True)
-
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # --- TABELAS E MAPA ---
-        col_g1, col_g2 = st.columns(2)
-        with col_g1:
-            st.markdown(f"### 🥓 Foco: Perda de Gordura ({periodo_texto})")
-            gord_df = ranking_df.sort_values("Perda_Gordura", ascending=False)[['Pessoa', 'Perda_Gordura']]
-            st.dataframe(gord_df.rename(columns={'Perda_Gordura': 'Eliminado (%)'}).style.background_gradient(cmap="Greens").format("{:.2f}", subset=['Eliminado (%)']),hide_index=True, use_container_width=True)
-
-        with col_g2:
-            st.markdown(f"### 💪 Foco: Ganho de Massa Magra ({periodo_texto})")
-            massa_df = ranking_df.sort_values("Ganho_Musculo", ascending=False)[['Pessoa', 'Ganho_Musculo']]
-            st.dataframe(massa_df.rename(columns={'Ganho_Musculo': 'Ganho (%)'}).style.background_gradient(cmap="Greens").format("{:.2f}", subset=['Ganho (%)']),hide_index=True, use_container_width=True)
-        st.divider()
-        st.markdown(f"### 🗺️ Mapa de Resultados ({periodo_texto})")
-        fig_mapa = px.scatter(ranking_df, x="Ganho_Musculo", y="Perda_Gordura", text="Pessoa", 
-                              size="Peso_Atual", color="Pessoa", template="plotly_white")
-        fig_mapa.update_layout(margin=dict(t=0, b=0))
-        st.plotly_chart(fig_mapa, use_container_width=True)
+elif selected == "Grupo":
+    st.markdown("# 👥 Visão do Grupo")
+    tela_grupo(df, versao_dados)
         
 # --- TELAS RESTRITAS ---
 elif selected == "Dicas" and st.session_state['logado']:
     hub_conteudo.exibir_hub()
 
 elif selected == "Assistente IA" and st.session_state['logado']:
-    if not df_person.empty: assistente_ia.exibir_assistente(ultimo_registro)
+    import assistente_ia
+    if not df_person.empty:
+        # Resumo do histórico de todos os membros, calculado uma vez por versão dos dados
+        resumos = analises.resumo_em_cache(df, versao_dados, grupo.banco, versao_metas)
+        assistente_ia.exibir_assistente(ultimo_registro, analises.texto_resumo(resumos, selected_person, projecao),
+                                        grupo.chave, analises.texto_faixas(resumos, selected_person, projecao))
     else: st.warning("Selecione alguém com dados primeiro.")
 
 elif selected == "Nutri-Vision" and st.session_state['logado']:
+    import nutri_vision
     if not df_person.empty: nutri_vision.exibir_nutri_vision(ultimo_registro)
     else: st.warning("Selecione alguém com dados primeiro.")
 
 elif selected == "Regulamento":
     if not df_person.empty: regulamento.exibir_regulamento(ultimo_registro)
-    else: st.warning("Selecione alguém com dados primeiro.")
\ No newline at end of file
+    else: st.warning("Selecione alguém com dados primeiro.")
+
+execucao.marco(f"Tela {selected}")
+if 'perfil_historico' not in st.session_state: st.session_state['perfil_historico'] = perfil.novo_historico()
+perfil.finalizar(execucao, st.session_state['perfil_historico'], selected, st.session_state['usuario_atual'])
+
+# ==============================================================================
+# 8. PAINEL DE DESEMPENHO (SÓ LOGADOS)
+# ==============================================================================
+if st.session_state['logado']:
+    with painel_desempenho.expander("⚙️ Desempenho"):
+        st.caption(f"Cache de dados: {dados.estatisticas['hits']} hits / {dados.estatisticas['misses']} misses")
+        st.caption(f"Memória do histórico: {dados.estatisticas['bytes_antes']/1024:.0f} KB → "
+                   f"{dados.estatisticas['bytes_depois']/1024:.0f} KB com tipos compactos")
+        cache_fig = graficos.cache_figuras
+        st.caption(f"Cache de gráficos: {cache_fig.hits} hits / {cache_fig.misses} misses | "
+                   f"economia nesta execução: {economia_figuras*1000:.0f} ms | total: {cache_fig.tempo_economizado:.1f} s")
+        ia = cache_ia.estatisticas()
+        st.caption(f"Cache da IA: {ia['hits']} hits / {ia['misses']} misses ({ia['taxa']:.0%}) | "
+                   f"{ia['segundos_economizados']:.0f} s de espera economizados | {ia['itens']} respostas, "
+                   f"{ia['bytes']/1024:.0f} KB")
+        gemini = cliente_ia.estatisticas
+        if gemini["chamadas"]:
+            st.caption(f"Gemini ({cliente_ia.nome_modelo()}): {gemini['chamadas']} chamadas, {gemini['erros']} erros | "
+                       f"latência média {gemini['latencia_total']/gemini['chamadas']:.1f} s, 1º trecho em "
+                       f"{gemini['primeiro_token_total']/gemini['chamadas']:.1f} s | "
+                       f"tokens {gemini['tokens_entrada']} entrada / {gemini['tokens_saida']} saída")
+
+        # Perfil por execução e verificação do ranking: só o admin vê e liga
+        if st.session_state['usuario_atual'] == "admin":
+            st.markdown("---")
+            if st.button("Verificar ranking incremental"):  # recalcula tudo segurando a trava do ranking
+                divergentes = ranking.verificar_consistencia(df, versao_dados, grupo.banco)
+                if divergentes: st.error(f"Divergência em {len(divergentes)} janela(s): {divergentes}")
+                else: st.success("Rankings incrementais idênticos ao recálculo completo.")
+            st.toggle("⏱️ Perfil por execução", key="perfil_ativo")
+            historico = st.session_state['perfil_historico']
+            if historico:
+                tempos = pd.DataFrame([{"Tela": r["tela"], "Total": r["total_ms"], **r["secoes_ms"]} for r in historico])
+                st.caption(f"Última execução: {historico[-1]['total_ms']:.0f} ms (tempos em ms)")
+                st.dataframe(tempos.iloc[::-1].round(1), hide_index=True, use_container_width=True)
+            elif not execucao.ativa:
+                st.caption("Ligue para medir as próximas execuções.")
\ No newline at end of file
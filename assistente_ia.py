@@ -1,26 +1,25 @@
 import streamlit as st
-import google.generativeai as genai
-from fpdf import FPDF
-import time
+
+import cache_ia
+import cliente_ia
+import conversa
 
 # ==============================================================================
 # 1. CONFIGURAÇÃO DA CHAVE E CONEXÃO
 # ==============================================================================
 def configurar_ia():
-    try:
-        # Busca a chave no cofre de segredos do Streamlit
-        api_key = st.secrets["GOOGLE_API_KEY"]
-        genai.configure(api_key=api_key)
+    # Chave no cofre de segredos do Streamlit; o cliente só é configurado uma vez por processo
+    if cliente_ia.configurar():
         return True
-    except Exception as e:
-        st.error("❌ Erro: Chave API não configurada nos Secrets.")
-        return False
+    st.error("❌ Erro: Chave API não configurada nos Secrets.")
+    return False
 
 # ==============================================================================
 # 2. FUNÇÃO QUE CRIA O PDF
 # ==============================================================================
 def gerar_pdf(texto_treino, nome_aluno):
     """Gera um PDF simples com o conteúdo da IA"""
+    from fpdf import FPDF  # só carrega a biblioteca de PDF quando há um plano para baixar
     pdf = FPDF()
     pdf.add_page()
     
@@ -47,14 +46,20 @@ def gerar_pdf(texto_treino, nome_aluno):
 # ==============================================================================
 # 3. TELA PRINCIPAL DO CHAT
 # ==============================================================================
-def exibir_assistente(dados_aluno):
+def exibir_assistente(dados_aluno, resumo_historico="", grupo="", resumo_faixas=""):
+    """Chat com o Personal AI.
+
+    A primeira pergunta leva `resumo_faixas` (analises.texto_faixas), que com o `grupo`
+    entra na chave do cache de respostas; as seguintes, que não usam o cache, levam o
+    `resumo_historico` completo (analises.texto_resumo).
+    """
     # --- Cabeçalho ---
     col1, col2 = st.columns([4, 1])
     with col1:
         st.title("🤖 Personal AI")
     with col2:
         if st.button("Limpar Chat"):
-            st.session_state.messages = []
+            conversa.limpar(st.session_state)
             if "ultimo_treino" in st.session_state:
                 del st.session_state["ultimo_treino"]
             st.rerun()
@@ -87,43 +92,46 @@ def exibir_assistente(dados_aluno):
         )
 
     # --- Área de Digitação ---
-    if prompt := st.chat_input("Ex: Monte um treino de pernas avançado..."):
-        # 1. Mostra a pergunta do usuário
+    if prompt := st.chat_input("Ex: Monte um treino de pernas avançado...",
+                               max_chars=conversa.MAX_CARACTERES_PERGUNTA):
+        # 1. Conversa anterior (resumo + mensagens recentes, com tamanho limitado) e a pergunta
+        historico = conversa.preparar(st.session_state)
         st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # 2. Contexto para a IA
+        # 2. Contexto para a IA (na primeira pergunta, só o que entra na chave do cache)
+        resumo = resumo_historico if historico else resumo_faixas
         contexto = f"""
         Você é o Personal Trainer oficial do Grupo DPJ.
         Aluno: {dados_aluno.get('Pessoa')}.
         Métricas Atuais: Peso {dados_aluno.get('Peso')}kg, IMC {dados_aluno.get('IMC')}, Gordura {dados_aluno.get('Perc_Gordura')}%.
+        {resumo}
         
         INSTRUÇÃO: Responda de forma completa. Use listas e tópicos.
         Evite usar muitos emojis no meio das palavras para facilitar a leitura no PDF.
         """
 
-        # 3. Gera a resposta
+        conteudo = [contexto, historico, prompt] if historico else [contexto, prompt]
+
+        # 3. Gera a resposta (na primeira mensagem, reaproveita uma pergunta parecida de
+        # alguém com métricas parecidas; depois a resposta depende da conversa)
         with st.chat_message("assistant"):
             try:
-                # Usando o modelo Flash (rápido e barato)
-                # Se der erro 404, mude para 'gemini-1.5-pro'
-                model = genai.GenerativeModel('gemini-2.5-flash')
-                
-                response = model.generate_content(
-                    [contexto, prompt],
-                    stream=True # Efeito de digitação
-                )
-                
-                placeholder = st.empty()
-                full_response = ""
-                
-                # Renderiza palavra por palavra
-                for chunk in response:
-                    full_response += chunk.text
-                    placeholder.markdown(full_response + "▌")
+                nome = str(dados_aluno.get('Pessoa') or "")
+                chave = cache_ia.chave(prompt, dados_aluno, cliente_ia.nome_modelo(), grupo, resumo_faixas)
+                guardada = None if historico else cache_ia.obter(chave, nome)
+
+                if guardada is not None:
+                    pedacos = cache_ia.reproduzir(guardada)
+                else:
+                    # Streaming para o efeito de digitação; a chamada mede latência e tokens
+                    pedacos = cliente_ia.gerar(conteudo)
                 
-                placeholder.markdown(full_response)
+                # Efeito de digitação com a tela atualizada em intervalos (o cache passa pela mesma renderização)
+                full_response = cliente_ia.renderizar_streaming(pedacos, st.empty())
+                if guardada is None and not historico:
+                    cache_ia.guardar(chave, full_response, pedacos.latencia, nome)
                 
                 # Salva no histórico
                 st.session_state.messages.append({"role": "assistant", "content": full_response})
@@ -0,0 +1,79 @@
+"""Benchmark da importação em blocos (importacao.py) com um CSV grande.
+
+Gera um CSV no formato de exportação de balança (separador ;, vírgula decimal,
+datas dd/mm/aaaa), importa num banco que já tem parte das medições e importa de
+novo (tudo duplicado). Relata tempo, linhas importadas/duplicadas e o pico de
+memória Python de uma terceira importação, medida à parte (o tracemalloc deixa a
+importação várias vezes mais lenta), em JSON.
+
+Uso: python benchmarks/bench_importacao.py [--membros 50000] [--medicoes 20] [--ja-no-banco 0.1]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import dados
+import importacao
+from gerar_dados import gerar_medicoes
+
+
+def gerar_csv(caminho, membros, medicoes):
+    """Grava o CSV e devolve as primeiras linhas (para pré-carregar o banco)."""
+    df = gerar_medicoes(membros, medicoes)
+    exportado = df.rename(columns={"Pessoa": "Nome", "Data": "Data/Hora", "Peso": "Peso (kg)",
+                                   "Perc_Gordura": "Gordura Corporal (%)", "Perc_Musc": "Massa Muscular",
+                                   "RM": "TMB", "Idade": "Idade Corporal", "Visceral": "Gordura Visceral"})
+    exportado["Data/Hora"] = exportado["Data/Hora"].dt.strftime("%d/%m/%Y")
+    exportado.to_csv(caminho, sep=";", decimal=",", index=False)
+    return df
+
+
+def medir(caminho, banco):
+    inicio = time.perf_counter()
+    resultado = importacao.importar_arquivo(caminho, caminho, banco)
+    return {"segundos": round(time.perf_counter() - inicio, 2), **resultado._asdict()}
+
+
+def pico_memoria(caminho, banco):
+    tracemalloc.start()
+    importacao.importar_arquivo(caminho, caminho, banco)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(pico / 1e6, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--membros", type=int, default=50000)
+    parser.add_argument("--medicoes", type=int, default=20, help="medições por membro")
+    parser.add_argument("--ja-no-banco", type=float, default=0.1, help="fração já gravada antes da importação")
+    args = parser.parse_args()
+
+    origem = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)
+        try:
+            caminho, banco = os.path.join(pasta, "exportacao.csv"), os.path.join(pasta, "bench.db")
+            df = gerar_csv(caminho, args.membros, args.medicoes)
+            dados.save_data(df.iloc[:int(len(df) * args.ja_no_banco)], banco)
+            del df
+            relatorio = {
+                "linhas": args.membros * args.medicoes,
+                "tamanho_csv_mb": round(os.path.getsize(caminho) / 1e6, 1),
+                "importacao": medir(caminho, banco),
+                "reimportacao": medir(caminho, banco),
+                "pico_memoria_mb": pico_memoria(caminho, banco),
+            }
+        finally:
+            os.chdir(origem)
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
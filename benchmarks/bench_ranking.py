@@ -0,0 +1,65 @@
+"""Benchmark do ranking: groupby().apply(filtrar_por_periodo) x ranking.calcular_ranking.
+
+Gera membros x medições sintéticos e mede o tempo de cada caminho (todo o período e
+últimos 30 dias). A referência groupby().apply e a conferência de que os números são
+idênticos ficam em tests/test_ranking.py. Mede também a atualização incremental
+(ranking.TabelaRanking) de uma inserção.
+
+Uso: python benchmarks/bench_ranking.py [--membros 10000] [--medicoes 200] [--sem-legado]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, "tests")]
+import ranking
+from gerar_dados import gerar_medicoes
+from test_ranking import ranking_legado
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def medir_incremental(df):
+    """Uma nova medição: atualização incremental da tabela x recálculo completo."""
+    tabela = ranking.TabelaRanking(df, 1, ranking.Janela(dias=30))
+    pessoa = df['Pessoa'].iloc[0]
+    nova = df[df['Pessoa'] == pessoa].iloc[[-1]].assign(Data=df['Data'].max() + pd.Timedelta(days=1), Peso=70.0)
+    completo_df = pd.concat([df, nova], ignore_index=True)
+    historico = completo_df[completo_df['Pessoa'] == pessoa]
+
+    _, t_incremental = cronometrar(lambda: (tabela.atualizar_pessoa(historico, pessoa, 2), tabela.ranking()))
+    completo, t_completo = cronometrar(ranking.calcular_ranking, completo_df, 30)
+    pd.testing.assert_frame_equal(tabela.ranking()[ranking.COLUNAS_RANKING], completo, check_dtype=False, check_exact=True)
+    print(f"{'inserção':>15}: incremental {t_incremental:.4f}s | recálculo completo {t_completo:.3f}s | tabelas idênticas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--membros", type=int, default=10000)
+    parser.add_argument("--medicoes", type=int, default=200)
+    parser.add_argument("--sem-legado", action="store_true", help="mede só a versão vetorizada")
+    args = parser.parse_args()
+
+    df = gerar_medicoes(args.membros, args.medicoes)
+    print(f"{df['Pessoa'].nunique()} membros, {len(df)} medições")
+
+    for dias, trinta_dias in ((None, False), (30, True)):
+        novo, t_novo = cronometrar(ranking.calcular_ranking, df, dias)
+        linha = f"{'30 dias' if trinta_dias else 'todo o período':>15}: vetorizado {t_novo:.3f}s"
+        if not args.sem_legado:
+            _, t_legado = cronometrar(ranking_legado, df, trinta_dias)
+            linha += f" | groupby().apply {t_legado:.3f}s | {t_legado / t_novo:.0f}x"
+        print(linha)
+    medir_incremental(df)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Bytes enviados ao navegador ao mostrar uma resposta longa da IA em streaming.
+
+Cada placeholder.markdown() vira uma mensagem (ForwardMsg) com o markdown inteiro
+pelo websocket. Compara o laço antigo (uma atualização por pedaço) com
+cliente_ia.renderizar_streaming (atualização limitada por tempo), com pedaços
+chegando no ritmo de um modelo em streaming. Relata mensagens e bytes em JSON.
+
+Uso: python benchmarks/bytes_streaming.py [--caracteres 8000] [--pedaco 40] [--ms-por-pedaco 15]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+import cliente_ia
+
+
+class PlaceholderMedido:
+    """Conta as mensagens e o tamanho serializado de cada uma, como o Streamlit enviaria."""
+
+    def __init__(self):
+        self.mensagens = 0
+        self.bytes = 0
+        self.ultimo = None
+
+    def markdown(self, corpo):
+        msg = ForwardMsg()
+        msg.metadata.delta_path[:] = [0, 3, 1]
+        msg.delta.new_element.markdown.body = corpo
+        self.mensagens += 1
+        self.bytes += msg.ByteSize()
+        self.ultimo = corpo
+
+
+def resposta(caracteres):
+    frase = "- Agachamento livre: 4 séries de 10 repetições, descanso de 90 segundos.\n"
+    return (frase * (caracteres // len(frase) + 1))[:caracteres]
+
+
+def pedacos(texto, tamanho, atraso):
+    for i in range(0, len(texto), tamanho):
+        time.sleep(atraso)
+        yield texto[i:i + tamanho]
+
+
+def laco_antigo(origem, placeholder):
+    texto = ""
+    for pedaco in origem:
+        texto += pedaco
+        placeholder.markdown(texto + "▌")
+    placeholder.markdown(texto)
+    return texto
+
+
+def medir(renderizar, texto, tamanho, atraso):
+    placeholder = PlaceholderMedido()
+    inicio = time.perf_counter()
+    final = renderizar(pedacos(texto, tamanho, atraso), placeholder)
+    assert final == texto and placeholder.ultimo == texto
+    return {"mensagens": placeholder.mensagens, "kb_enviados": round(placeholder.bytes / 1024, 1),
+            "segundos": round(time.perf_counter() - inicio, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--caracteres", type=int, default=8000)
+    parser.add_argument("--pedaco", type=int, default=40, help="caracteres por pedaço")
+    parser.add_argument("--ms-por-pedaco", type=float, default=15)
+    args = parser.parse_args()
+
+    texto, atraso = resposta(args.caracteres), args.ms_por_pedaco / 1000
+    antes = medir(laco_antigo, texto, args.pedaco, atraso)
+    depois = medir(cliente_ia.renderizar_streaming, texto, args.pedaco, atraso)
+    print(json.dumps({"caracteres": args.caracteres, "pedacos": -(-args.caracteres // args.pedaco),
+                      "intervalo_render_s": cliente_ia.INTERVALO_RENDER,
+                      "antes": antes, "depois": depois,
+                      "reducao_bytes": round(antes["kb_enviados"] / depois["kb_enviados"], 1)},
+                     indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""Teste de carga: N sessões simultâneas do painel num único processo Streamlit.
+
+Cada sessão (um AppTest) abre o painel, faz login, troca de membro, vai ao
+Ranking, alterna o período (Todo o Período <-> Últimos 30 Dias) e envia uma
+medição pelo formulário. Relata latência de rerun (p50/p95/p99) por ação e a
+memória por sessão, em JSON.
+
+Com --perfil, liga o perfil por seções (perfil.py) e compara, por tela, o rerun
+completo com o trecho que vira fragmento (st.fragment): é o custo de interagir
+com os controles do Ranking ou com o formulário antes e depois do rerun parcial.
+O AppTest sempre reexecuta o script inteiro, então o "depois" é estimado pela
+seção da tela, que é o que um rerun de fragmento executa.
+
+Roda offline: google.generativeai é substituído por um stub e o option_menu
+(componente de front-end, que o AppTest não clica) lê a tela de
+st.session_state["tela_carga"].
+
+Uso: python benchmarks/carga_sessoes.py [--sessoes 20] [--membros 200] [--medicoes 20] [--perfil]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+APP = os.path.join(RAIZ, "app.py")
+
+
+# ==============================================================================
+# 1. STUBS (SEM REDE)
+# ==============================================================================
+def instalar_stubs():
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+
+    class ModeloFalso:
+        def __init__(self, nome, *args, **kwargs):
+            self.nome = nome
+
+        def generate_content(self, conteudo, stream=False, **kwargs):
+            return iter([types.SimpleNamespace(text="Resposta simulada para o teste de carga.")])
+
+    genai.GenerativeModel = ModeloFalso
+    try:
+        import google
+    except ImportError:
+        google = sys.modules["google"] = types.ModuleType("google")
+    google.generativeai = genai
+    sys.modules["google.generativeai"] = genai
+
+    menu = types.ModuleType("streamlit_option_menu")
+
+    def option_menu(menu_title, options, **kwargs):
+        import streamlit as st
+        tela = st.session_state.get("tela_carga", options[0])
+        return tela if tela in options else options[0]
+
+    menu.option_menu = option_menu
+    sys.modules["streamlit_option_menu"] = menu
+
+
+# ==============================================================================
+# 2. ROTEIRO DE UMA SESSÃO
+# ==============================================================================
+# A primeira execução de cada AppTest compila o app.py; no Python 3.11 o ast.parse
+# simultâneo em várias threads falha de vez em quando ("AST constructor recursion
+# depth mismatch"), então só essa etapa é feita uma sessão por vez.
+_trava_compilacao = threading.Lock()
+
+
+def _cronometrar(latencias, acao, executar):
+    inicio = time.perf_counter()
+    at = executar()
+    latencias.setdefault(acao, []).append((time.perf_counter() - inicio) * 1000)
+    if at.exception:
+        raise RuntimeError(f"{acao}: {at.exception[0].message}")
+    return at
+
+
+def _por_rotulo(elementos, rotulo):
+    return next(e for e in elementos if e.label == rotulo)
+
+
+def roteiro(pessoas, trocas, latencias, rng, com_insercao=True):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.secrets["passwords"] = {"admin": "carga"}
+    with _trava_compilacao:
+        _cronometrar(latencias, "abrir", at.run)
+
+    # Login: o diálogo não é clicável no AppTest; o efeito dele é este estado
+    at.session_state["logado"] = True
+    at.session_state["usuario_atual"] = "admin"
+    _cronometrar(latencias, "login", at.run)
+
+    for _ in range(trocas):
+        membro = _por_rotulo(at.sidebar.selectbox, "Visualizar Membro:")
+        _cronometrar(latencias, "trocar_membro", membro.select(rng.choice(pessoas)).run)
+
+    at.session_state["tela_carga"] = "Ranking"
+    _cronometrar(latencias, "abrir_ranking", at.run)
+    for periodo in ("Últimos 30 Dias", "Todo o Período") * trocas:
+        seletor = _por_rotulo(at.selectbox, "Período:")
+        _cronometrar(latencias, "alternar_periodo", seletor.select(periodo).run)
+
+    if com_insercao:
+        at.session_state["tela_carga"] = "Individual"
+        at.run()
+        _cronometrar(latencias, "salvar_medicao", _por_rotulo(at.button, "💾 Salvar Dados").click().run)
+    return at
+
+
+# ==============================================================================
+# 3. EXECUÇÃO E RELATÓRIO
+# ==============================================================================
+def percentis(valores):
+    ordenados = sorted(valores)
+
+    def p(q):
+        return round(ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))], 2)
+
+    return {"n": len(valores), "p50_ms": p(0.50), "p95_ms": p(0.95), "p99_ms": p(0.99),
+            "media_ms": round(statistics.fmean(valores), 2)}
+
+
+def resumo_perfil(registros):
+    """Média por seção e, por tela, rerun completo x seção da tela (estimativa do fragmento)."""
+    secoes = {}
+    for registro in registros:
+        for nome, ms in registro["secoes_ms"].items(): secoes.setdefault(nome, []).append(ms)
+    telas = {}
+    for registro in registros:
+        tela = telas.setdefault(registro["tela"], {"completo": [], "fragmento": []})
+        tela["completo"].append(registro["total_ms"])
+        tela["fragmento"].append(registro["secoes_ms"].get(f"Tela {registro['tela']}", 0.0))
+    return {
+        "execucoes": len(registros),
+        "secoes_media_ms": {nome: round(statistics.fmean(v), 2) for nome, v in secoes.items()},
+        "por_tela": {nome: {"rerun_completo_media_ms": round(statistics.fmean(t["completo"]), 2),
+                            "fragmento_estimado_media_ms": round(statistics.fmean(t["fragmento"]), 2)}
+                     for nome, t in telas.items()},
+    }
+
+
+def preparar_dados(pasta, membros, medicoes):
+    """Banco sintético na pasta de trabalho (o app usa caminhos relativos)."""
+    import dados
+    from gerar_dados import gerar_medicoes
+    df = gerar_medicoes(membros, medicoes)
+    dados.save_data(df, os.path.join(pasta, dados.ARQUIVO_BANCO))
+    return list(df['Pessoa'].unique())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessoes", type=int, default=20)
+    parser.add_argument("--membros", type=int, default=200)
+    parser.add_argument("--medicoes", type=int, default=20)
+    parser.add_argument("--trocas", type=int, default=3, help="trocas de membro/período por sessão")
+    parser.add_argument("--sem-insercao", action="store_true", help="não envia medições")
+    parser.add_argument("--perfil", action="store_true", help="tempos por seção e estimativa do rerun parcial")
+    parser.add_argument("--saida", help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args()
+
+    instalar_stubs()
+    if args.perfil:
+        import perfil
+        perfil.ATIVO_PARA_TODOS = True
+    origem = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        os.chdir(pasta)
+        try:
+            pessoas = preparar_dados(pasta, args.membros, args.medicoes)
+
+            # Latência: todas as sessões ao mesmo tempo, como usuários reais
+            latencias, trava, erros, execucoes = {}, threading.Lock(), [], []
+
+            def sessao(i):
+                locais = {}
+                try:
+                    at = roteiro(pessoas, args.trocas, locais, random.Random(i), not args.sem_insercao)
+                    if args.perfil:
+                        with trava: execucoes.extend(at.session_state["perfil_historico"])
+                except Exception as e:
+                    erros.append(repr(e))
+                with trava:
+                    for acao, tempos in locais.items(): latencias.setdefault(acao, []).extend(tempos)
+
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.sessoes) as executor:
+                list(executor.map(sessao, range(args.sessoes)))
+            duracao = time.perf_counter() - inicio
+
+            # Memória: sessões vivas ao mesmo tempo, medidas à parte (tracemalloc distorce a latência)
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            vivas = [roteiro(pessoas, 1, {}, random.Random(i), False) for i in range(min(args.sessoes, 10))]
+            por_sessao = (tracemalloc.get_traced_memory()[0] - base) / len(vivas)
+            tracemalloc.stop()
+        finally:
+            os.chdir(origem)
+
+    todas = [t for tempos in latencias.values() for t in tempos]
+    relatorio = {
+        "sessoes": args.sessoes, "membros": args.membros, "medicoes": args.membros * args.medicoes,
+        "duracao_s": round(duracao, 2), "erros": erros[:10],
+        "rerun": percentis(todas) if todas else None,
+        "por_acao": {acao: percentis(tempos) for acao, tempos in latencias.items()},
+        "memoria_por_sessao_kb": round(por_sessao / 1024, 1),
+    }
+    if args.perfil:
+        relatorio["perfil"] = resumo_perfil(execucoes)
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo: arquivo.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
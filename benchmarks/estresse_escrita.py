@@ -0,0 +1,82 @@
+"""Teste de estresse das gravações concorrentes.
+
+Dispara muitas inserções simultâneas pelo mesmo caminho do formulário
+(dados.inserir_medicao), em threads e em processos, enquanto a planilha é
+exportada em paralelo (dados.exportar_excel, o botão "Exportar Excel"), e
+confere que nenhuma linha se perdeu.
+
+Uso: python benchmarks/estresse_escrita.py [--threads 16] [--processos 4] [--insercoes 50]
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dados
+
+
+def _registro(origem, i):
+    return {
+        "Pessoa": f"Estresse {origem}", "Data": pd.Timestamp("2026-01-01") + pd.Timedelta(minutes=i),
+        "Peso": 80.0, "IMC": 25.0, "Perc_Gordura": 20.0,
+        "Perc_Musc": 30.0, "RM": 1700, "Idade": 30, "Visceral": 8,
+    }
+
+
+def _inserir_varias(banco, origem, quantidade, falhas):
+    for i in range(quantidade):
+        if not dados.inserir_medicao(_registro(origem, i), banco):
+            falhas.append((origem, i))
+
+
+def _processo(banco, origem, quantidade):
+    falhas = []
+    _inserir_varias(banco, origem, quantidade, falhas)
+    if falhas: sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--processos", type=int, default=4)
+    parser.add_argument("--insercoes", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        banco = os.path.join(pasta, "estresse.db")
+        inicial = len(dados.load_data(banco))
+
+        falhas = []
+        threads = [threading.Thread(target=_inserir_varias, args=(banco, f"T{t}", args.insercoes, falhas))
+                   for t in range(args.threads)]
+        # "spawn": um fork com threads gravando herdaria travas já adquiridas
+        contexto = multiprocessing.get_context("spawn")
+        processos = [contexto.Process(target=_processo, args=(banco, f"P{p}", args.insercoes))
+                     for p in range(args.processos)]
+        for trabalho in threads + processos: trabalho.start()
+
+        # Exporta a planilha repetidamente enquanto as inserções acontecem
+        exportacoes = 0
+        while any(t.is_alive() for t in threads):
+            pd.read_excel(io.BytesIO(dados.exportar_excel(banco)), engine='openpyxl')  # nunca truncada
+            exportacoes += 1
+
+        for trabalho in threads + processos: trabalho.join()
+
+        esperado = inicial + (args.threads + args.processos) * args.insercoes
+        final = len(dados.load_data(banco))
+        print(f"Inserções esperadas: {esperado} | no banco: {final} | exportações concluídas: {exportacoes}")
+        assert not falhas, f"Inserções recusadas: {falhas[:5]}"
+        assert all(p.exitcode == 0 for p in processos), "Algum processo falhou ao inserir"
+        assert final == esperado, f"{esperado - final} linhas perdidas"
+        print("OK: nenhuma linha perdida.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Gerador de medições sintéticas no formato da "Série histórica das medições".
+
+Cada membro começa com valores plausíveis de bioimpedância e evolui em passeio
+aleatório, com medições a cada 3-14 dias. Grava em .xlsx (mesmas colunas da
+planilha) ou direto num banco .db do painel.
+
+Uso: python benchmarks/gerar_dados.py --membros 1000 --medicoes 20 --saida sintetico.xlsx
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def gerar_medicoes(membros, medicoes, semente=42, inicio="2025-01-06"):
+    """DataFrame com `membros` x `medicoes` linhas, colunas de dados.COLUNAS."""
+    rng = np.random.default_rng(semente)
+    n = membros * medicoes
+
+    def evolucao(base, passo):
+        """Valor inicial por membro + passeio aleatório ao longo das medições."""
+        passos = rng.normal(0, passo, size=(membros, medicoes))
+        passos[:, 0] = 0
+        return (np.asarray(base)[:, None] + passos.cumsum(axis=1)).ravel()
+
+    intervalos = rng.integers(3, 15, size=(membros, medicoes))
+    intervalos[:, 0] = rng.integers(0, 30, size=membros)
+    datas = np.datetime64(inicio) + intervalos.cumsum(axis=1).ravel().astype("timedelta64[D]")
+
+    altura = np.repeat(rng.normal(1.70, 0.09, membros), medicoes)
+    peso = evolucao(rng.normal(82, 14, membros), 0.6).clip(45, 180)
+    return pd.DataFrame({
+        "Pessoa": np.repeat([f"Membro {i:06d}" for i in range(membros)], medicoes),
+        "Data": datas,
+        "Peso": peso.round(1),
+        "IMC": (peso / altura ** 2).round(1),
+        "Perc_Gordura": evolucao(rng.normal(30, 7, membros), 0.4).clip(5, 60).round(1),
+        "Perc_Musc": evolucao(rng.normal(31, 5, membros), 0.3).clip(15, 50).round(1),
+        "RM": evolucao(rng.normal(1650, 220, membros), 8).clip(1000, 3000).round().astype(int),
+        "Idade": evolucao(rng.integers(20, 70, membros), 0.3).clip(18, 90).round().astype(int),
+        "Visceral": evolucao(rng.integers(3, 16, membros), 0.2).clip(1, 30).round().astype(int),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--membros", type=int, default=1000)
+    parser.add_argument("--medicoes", type=int, default=20, help="medições por membro")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="sintetico.xlsx", help=".xlsx ou .db")
+    args = parser.parse_args()
+
+    df = gerar_medicoes(args.membros, args.medicoes, args.semente)
+    if args.saida.endswith(".db"):
+        import dados
+        dados.save_data(df, args.saida)
+    else:
+        df.to_excel(args.saida, index=False, engine='openpyxl')
+    print(f"{len(df)} medições de {args.membros} membros gravadas em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
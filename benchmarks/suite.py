@@ -0,0 +1,126 @@
+"""Suíte de benchmarks dos caminhos quentes do painel, com saída em JSON.
+
+Para cada escala (número de membros) gera dados sintéticos e mede:
+load_data (frio e com cache), save_data (regravação completa), inserir_medicao,
+o ranking (todo o período e 30 dias), o filtro por pessoa (máscara antiga x
+índice por pessoa), a montagem das figuras da tela Individual e os agregados
+da tela Grupo (construção completa x soma de uma medição).
+
+Uso: python benchmarks/suite.py [--membros 10 1000 100000] [--medicoes 10] [--saida resultado.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+import agregados
+import dados
+import graficos
+import ranking
+from gerar_dados import gerar_medicoes
+
+
+def cronometrar(funcao, repeticoes, preparar=None):
+    """Mediana e mínimo (em ms) de `repeticoes` execuções de `funcao`."""
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar: preparar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {"mediana_ms": round(statistics.median(tempos), 3), "min_ms": round(min(tempos), 3)}
+
+
+def medir_escala(membros, medicoes, repeticoes, pasta):
+    df = gerar_medicoes(membros, medicoes)
+    banco = os.path.join(pasta, f"bench_{membros}.db")
+    pessoa = df['Pessoa'].iloc[len(df) // 2]
+    registro = df.iloc[-1].to_dict() | {"Data": df['Data'].max() + pd.Timedelta(days=1)}
+    resultados = {}
+
+    resultados["save_data"] = cronometrar(lambda: dados.save_data(df, banco), max(1, repeticoes // 2))
+    resultados["load_data_frio"] = cronometrar(lambda: dados.load_data(banco), repeticoes,
+                                               preparar=lambda: dados.invalidar(banco))
+    resultados["load_data_cache"] = cronometrar(lambda: dados.load_data(banco), repeticoes)
+    resultados["inserir_medicao"] = cronometrar(lambda: dados.inserir_medicao(registro, banco), repeticoes)
+    carregado, versao = dados.carregar_com_versao(banco)
+
+    resultados["ranking_todo_periodo"] = cronometrar(lambda: ranking.calcular_ranking(carregado), repeticoes)
+    resultados["ranking_30_dias"] = cronometrar(lambda: ranking.calcular_ranking(carregado, dias=30), repeticoes)
+
+    resultados["filtro_pessoa_mascara"] = cronometrar(
+        lambda: carregado[carregado['Pessoa'] == pessoa].sort_values(by="Data"), repeticoes)
+    resultados["indice_pessoas_construcao"] = cronometrar(lambda: dados.IndicePessoas(carregado), repeticoes)
+    indice = dados.IndicePessoas(carregado)
+    indice.historico(pessoa)
+    resultados["indice_pessoas_consulta"] = cronometrar(lambda: indice.historico(pessoa), repeticoes)
+
+    historico = indice.historico(pessoa)
+    resultados["figuras_construcao"] = cronometrar(lambda: graficos.construir_figuras(historico), repeticoes)
+    graficos.figuras_individuais(historico, pessoa, versao)
+    resultados["figuras_cache"] = cronometrar(lambda: graficos.figuras_individuais(historico, pessoa, versao), repeticoes)
+
+    resultados["agregados_construcao"] = cronometrar(lambda: agregados.AgregadosGrupo(carregado, versao), repeticoes)
+    tabela = agregados.AgregadosGrupo(carregado, versao)
+    novo = carregado.iloc[[-1]]
+    resultados["agregados_insercao"] = cronometrar(lambda: tabela.copia().adicionar(novo, versao), repeticoes)
+    resultados["agregados_estatisticas"] = cronometrar(
+        lambda: [tabela.estatisticas(m) for m in agregados.METRICAS], repeticoes,
+        preparar=lambda: tabela.adicionar(novo, versao))
+
+    return {"membros": membros, "medicoes": len(df), "resultados": resultados}
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--membros", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--medicoes", type=int, default=10, help="medições por membro")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--saida", help="arquivo JSON (padrão: stdout)")
+    args = parser.parse_args()
+
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "escalas": [],
+    }
+    origem = os.getcwd()
+    with tempfile.TemporaryDirectory() as pasta:
+        # Numa pasta vazia o banco de teste não importa a planilha real na migração
+        os.chdir(pasta)
+        try:
+            for membros in args.membros:
+                print(f"Medindo {membros} membros...", file=sys.stderr)
+                relatorio["escalas"].append(medir_escala(membros, args.medicoes, args.repeticoes, pasta))
+        finally:
+            os.chdir(origem)
+
+    texto = json.dumps(relatorio, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo: arquivo.write(texto)
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
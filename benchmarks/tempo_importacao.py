@@ -0,0 +1,82 @@
+"""Mede o início a frio do painel: `import app` (python -X importtime) em duas revisões.
+
+Cada revisão do git é extraída (git archive) numa pasta temporária e o app.py é
+importado num interpretador novo, como no primeiro acesso ao Streamlit (o corpo do
+script roda em "bare mode", sem sessão logada). Relata, em JSON, a mediana de:
+o tempo total do `import app`, a parte gasta importando módulos (total menos o
+corpo do próprio app.py), a quantidade de módulos carregados e quais bibliotecas
+pesadas (Gemini, FPDF, PIL) entraram.
+
+Uso: python benchmarks/tempo_importacao.py --antes <revisão> [--depois HEAD] [--repeticoes 5]
+  (ex: --antes <commit anterior ao import sob demanda do Gemini/FPDF/PIL>)
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PESADOS = ["google.generativeai", "fpdf", "PIL"]
+
+
+def extrair(revisao, pasta):
+    arquivo = subprocess.run(["git", "-C", RAIZ, "archive", revisao], capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(arquivo)) as tar:
+        tar.extractall(pasta, filter="data")
+
+
+def medir(pasta):
+    """(total µs, imports µs, módulos carregados, pesados carregados) de um `import app` a frio."""
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=pasta,
+                              capture_output=True, text=True, env={**os.environ, "PYTHONPATH": ""})
+    if processo.returncode != 0:
+        raise RuntimeError(processo.stderr.strip().splitlines()[-1])
+    modulos = {}
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "cumulative" in linha: continue
+        _, proprio, cumulativo, nome = (parte.strip() for parte in linha.replace("import time:", "|").split("|"))
+        modulos[nome] = (int(proprio), int(cumulativo))
+    proprio, total = modulos["app"]
+    pesados = sorted(p for p in PESADOS if p in modulos)
+    return total, total - proprio, len(modulos), pesados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--antes", required=True, help="revisão do git de referência")
+    parser.add_argument("--depois", default="HEAD")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = {"repeticoes": args.repeticoes, "revisoes": {}}
+    for rotulo, revisao in (("antes", args.antes), ("depois", args.depois)):
+        with tempfile.TemporaryDirectory() as pasta:
+            extrair(revisao, pasta)
+            try:
+                medidas = [medir(pasta) for _ in range(args.repeticoes)]
+            except RuntimeError as e:
+                resultado["revisoes"][rotulo] = {"revisao": revisao, "erro": str(e)}
+                continue
+        resultado["revisoes"][rotulo] = {
+            "revisao": revisao,
+            "import_app_ms": statistics.median(m[0] for m in medidas) / 1000,
+            "so_imports_ms": statistics.median(m[1] for m in medidas) / 1000,
+            "modulos": medidas[-1][2],
+            "pesados": medidas[-1][3],
+        }
+
+    antes = resultado["revisoes"]["antes"].get("import_app_ms")
+    depois = resultado["revisoes"]["depois"].get("import_app_ms")
+    if antes and depois:
+        resultado["ganho_ms"] = round(antes - depois, 1)
+        resultado["ganho_percentual"] = round(100 * (antes - depois) / antes, 1)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import sqlite3
+import hashlib
+import time
+import os
+import re
+import unicodedata
+from contextlib import closing
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+# Respostas do Gemini guardadas em disco (SQLite), compartilhadas entre sessões e
+# reinícios. Perguntas quase iguais de alunos com métricas parecidas caem na mesma
+# chave: texto normalizado + faixas de Peso, IMC e % Gordura + grupo e o resumo do
+# histórico em faixas (tendências, Indicador e situação da meta, sem valores exatos).
+ARQUIVO_CACHE = os.environ.get("PAINEL_CACHE_IA", "cache_ia.db")
+VALIDADE_SEGUNDOS = 7 * 24 * 3600
+MAX_BYTES = 20 * 1024 * 1024          # acima disso saem as respostas usadas há mais tempo
+FAIXAS = {"Peso": 2.0, "IMC": 1.0, "Perc_Gordura": 2.0}  # largura de cada faixa
+MARCADOR_NOME = "{aluno}"             # o nome do aluno não fica gravado na resposta
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS respostas (
+    chave TEXT PRIMARY KEY,
+    resposta TEXT NOT NULL,
+    criado REAL NOT NULL,
+    usado REAL NOT NULL,
+    bytes INTEGER NOT NULL,
+    latencia REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_respostas_usado ON respostas (usado);
+CREATE TABLE IF NOT EXISTS contadores (chave TEXT PRIMARY KEY, valor REAL NOT NULL);
+"""
+
+_preparados = set()
+
+def _conectar(arquivo):
+    con = sqlite3.connect(arquivo, timeout=30)
+    if arquivo not in _preparados:
+        con.execute("PRAGMA journal_mode=WAL")
+        con.executescript(ESQUEMA)
+        _preparados.add(arquivo)
+    return con
+
+def _somar(con, contador, valor=1):
+    con.execute("INSERT INTO contadores (chave, valor) VALUES (?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET valor = valor + excluded.valor", (contador, valor))
+
+# ==============================================================================
+# 2. CHAVE
+# ==============================================================================
+def normalizar(prompt):
+    """Minúsculas, sem acentos, pontuação e espaços repetidos."""
+    texto = unicodedata.normalize("NFKD", prompt).encode("ascii", "ignore").decode().lower()
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", texto).split())
+
+def chave(prompt, metricas, modelo="", grupo="", contexto=""):
+    """sha256 do prompt normalizado + faixa de cada métrica (+ modelo, grupo e contexto).
+
+    `contexto` deve ser só em faixas (analises.texto_faixas): valores exatos de um membro
+    fariam cada pessoa ter a própria chave.
+    """
+    faixas = []
+    for nome, largura in FAIXAS.items():
+        try:
+            faixas.append(f"{nome}={int(float(metricas.get(nome)) // largura)}")
+        except (TypeError, ValueError):
+            faixas.append(f"{nome}=?")
+    return hashlib.sha256("|".join([modelo, grupo, contexto, normalizar(prompt)] + faixas).encode()).hexdigest()
+
+# ==============================================================================
+# 3. LEITURA E GRAVAÇÃO
+# ==============================================================================
+def obter(chave_resposta, nome="", arquivo=ARQUIVO_CACHE):
+    """Resposta guardada (com o nome do aluno atual) ou None; conta hit/miss."""
+    agora = time.time()
+    with closing(_conectar(arquivo)) as con, con:
+        linha = con.execute("SELECT resposta, latencia FROM respostas WHERE chave = ? AND criado >= ?",
+                            (chave_resposta, agora - VALIDADE_SEGUNDOS)).fetchone()
+        if linha is None:
+            _somar(con, "misses")
+            return None
+        con.execute("UPDATE respostas SET usado = ? WHERE chave = ?", (agora, chave_resposta))
+        _somar(con, "hits")
+        _somar(con, "segundos_economizados", linha[1])
+    return linha[0].replace(MARCADOR_NOME, nome or "aluno")
+
+def guardar(chave_resposta, resposta, latencia, nome="", arquivo=ARQUIVO_CACHE):
+    """Grava a resposta e descarta as vencidas e, acima de MAX_BYTES, as menos usadas."""
+    agora = time.time()
+    # Só a palavra inteira: "Ana" não pode virar marcador dentro de "Analise"
+    texto = re.sub(rf"(?<!\w){re.escape(nome)}(?!\w)", MARCADOR_NOME, resposta) if nome else resposta
+    with closing(_conectar(arquivo)) as con, con:
+        con.execute("INSERT OR REPLACE INTO respostas VALUES (?, ?, ?, ?, ?, ?)",
+                    (chave_resposta, texto, agora, agora, len(texto.encode()), latencia))
+        con.execute("DELETE FROM respostas WHERE criado < ?", (agora - VALIDADE_SEGUNDOS,))
+        total = con.execute("SELECT COALESCE(SUM(bytes), 0) FROM respostas").fetchone()[0]
+        if total > MAX_BYTES:
+            # Soma acumulada em ordem de uso: apaga as mais antigas até caber
+            con.execute("""
+                DELETE FROM respostas WHERE chave IN (
+                    SELECT chave FROM (SELECT chave, SUM(bytes) OVER (ORDER BY usado, chave) - bytes AS antes
+                                       FROM respostas) WHERE antes < ?)""", (total - MAX_BYTES,))
+
+def reproduzir(resposta, tamanho=24):
+    """Pedaços de uma resposta guardada, para passar pela mesma renderização do streaming."""
+    palavras = resposta.split(" ")
+    for i in range(0, len(palavras), tamanho):
+        yield " ".join(palavras[i:i + tamanho]) + (" " if i + tamanho < len(palavras) else "")
+
+def estatisticas(arquivo=ARQUIVO_CACHE):
+    """Hits, misses, taxa de acerto, segundos economizados, itens e bytes em disco."""
+    with closing(_conectar(arquivo)) as con:
+        contadores = dict(con.execute("SELECT chave, valor FROM contadores").fetchall())
+        itens, total = con.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM respostas").fetchone()
+    hits, misses = int(contadores.get("hits", 0)), int(contadores.get("misses", 0))
+    return {"hits": hits, "misses": misses, "taxa": hits / (hits + misses) if hits + misses else 0.0,
+            "segundos_economizados": contadores.get("segundos_economizados", 0.0),
+            "itens": itens, "bytes": total}
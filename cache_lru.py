@@ -0,0 +1,40 @@
+import threading
+import time
+from collections import OrderedDict
+
+class CacheLRU:
+    """Cache LRU limitado e seguro entre threads, com contadores para o painel de desempenho.
+
+    Guarda, junto de cada valor, quanto tempo ele levou para ser construído: cada hit
+    soma esse tempo em `tempo_economizado`.
+    """
+
+    def __init__(self, max_itens):
+        self.max_itens = max_itens
+        self.hits = 0
+        self.misses = 0
+        self.tempo_economizado = 0.0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave, construir):
+        """Devolve (valor, segundos economizados nesta chamada), construindo só no miss."""
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                valor, custo = self._itens[chave]
+                self.hits += 1
+                self.tempo_economizado += custo
+                return valor, custo
+            self.misses += 1
+        inicio = time.perf_counter()
+        valor = construir()
+        custo = time.perf_counter() - inicio
+        with self._trava:
+            self._itens[chave] = (valor, custo)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens: self._itens.popitem(last=False)
+        return valor, 0.0
+
+    def __len__(self):
+        return len(self._itens)
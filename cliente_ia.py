@@ -0,0 +1,129 @@
+import streamlit as st
+import threading
+import time
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO (UMA VEZ POR PROCESSO)
+# ==============================================================================
+# Camada única de acesso ao Gemini para o assistente e o Nutri-Vision. O
+# genai.configure recria o cliente (e a conexão) a cada chamada, por isso só é chamado
+# quando a chave muda; os modelos também ficam guardados e são reaproveitados.
+# O google.generativeai só é importado na primeira chamada: o painel de desempenho
+# lê as estatísticas sem carregar a biblioteca.
+MODELO_PADRAO = "gemini-2.5-flash"  # trocar em [GEMINI_MODEL] nos Secrets (ex: "gemini-1.5-pro")
+INTERVALO_RENDER = 0.15             # s entre atualizações da tela durante o streaming
+CURSOR = "▌"
+
+_trava = threading.Lock()
+_chave_configurada = None
+_modelos = {}
+
+def nome_modelo():
+    """Modelo definido nos Secrets (GEMINI_MODEL) ou o padrão."""
+    try:
+        return st.secrets.get("GEMINI_MODEL", MODELO_PADRAO)
+    except Exception:
+        return MODELO_PADRAO
+
+def configurar():
+    """Configura o genai com a chave dos Secrets; não refaz se a chave não mudou."""
+    global _chave_configurada
+    try:
+        api_key = st.secrets["GOOGLE_API_KEY"]
+    except Exception:
+        return False
+    with _trava:
+        if api_key != _chave_configurada:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+            _chave_configurada = api_key
+            _modelos.clear()
+    return True
+
+def modelo(nome=None):
+    """GenerativeModel reaproveitado entre mensagens e sessões."""
+    nome = nome or nome_modelo()
+    with _trava:
+        if nome not in _modelos:
+            import google.generativeai as genai
+            _modelos[nome] = genai.GenerativeModel(nome)
+        return _modelos[nome]
+
+# ==============================================================================
+# 2. CHAMADA EM STREAMING COM MEDIDAS
+# ==============================================================================
+class Chamada:
+    """Itere para receber os pedaços do texto; ao final ficam no objeto a latência total,
+    o tempo até o primeiro pedaço (s) e os tokens de entrada/saída."""
+
+    def __init__(self, conteudo, nome=None):
+        self.conteudo = conteudo
+        self.nome = nome or nome_modelo()
+        self.latencia = None
+        self.primeiro_token = None
+        self.tokens_entrada = 0
+        self.tokens_saida = 0
+
+    def __iter__(self):
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            resposta = modelo(self.nome).generate_content(self.conteudo, stream=True)
+            for pedaco in resposta:
+                texto = pedaco.text
+                if self.primeiro_token is None: self.primeiro_token = time.perf_counter() - inicio
+                yield texto
+            uso = getattr(resposta, "usage_metadata", None)
+            self.tokens_entrada = getattr(uso, "prompt_token_count", 0) or 0
+            self.tokens_saida = getattr(uso, "candidates_token_count", 0) or 0
+            ok = True
+        finally:
+            self.latencia = time.perf_counter() - inicio
+            _registrar(self, ok)
+
+def gerar(conteudo, nome=None):
+    """Chamada em streaming ao modelo (veja Chamada)."""
+    return Chamada(conteudo, nome)
+
+def renderizar_streaming(pedacos, placeholder, intervalo=INTERVALO_RENDER):
+    """Escreve os pedaços em `placeholder` no máximo uma vez a cada `intervalo` s e
+    devolve o texto completo.
+
+    Cada atualização reenvia (e o navegador reprocessa) o markdown inteiro: atualizar a
+    cada pedaço custa bytes quadráticos no tamanho da resposta. Com o limite de taxa o
+    número de envios depende da duração, não da quantidade de pedaços. A última
+    renderização é sempre a do texto completo, sem cursor, mesmo se o streaming falhar.
+    """
+    buffer = []
+    ultimo = time.perf_counter()
+    try:
+        for pedaco in pedacos:
+            buffer.append(pedaco)
+            agora = time.perf_counter()
+            if agora - ultimo >= intervalo:
+                placeholder.markdown("".join(buffer) + CURSOR)
+                ultimo = agora
+    finally:
+        texto = "".join(buffer)
+        placeholder.markdown(texto)
+    return texto
+
+# ==============================================================================
+# 3. ESTATÍSTICAS DO PROCESSO
+# ==============================================================================
+estatisticas = {"chamadas": 0, "erros": 0, "latencia_total": 0.0, "primeiro_token_total": 0.0,
+                "tokens_entrada": 0, "tokens_saida": 0, "ultima": None}
+
+def _registrar(chamada, ok):
+    with _trava:
+        if not ok:
+            estatisticas["erros"] += 1
+            return
+        estatisticas["chamadas"] += 1
+        estatisticas["latencia_total"] += chamada.latencia
+        estatisticas["primeiro_token_total"] += chamada.primeiro_token or chamada.latencia
+        estatisticas["tokens_entrada"] += chamada.tokens_entrada
+        estatisticas["tokens_saida"] += chamada.tokens_saida
+        estatisticas["ultima"] = {"modelo": chamada.nome, "latencia": chamada.latencia,
+                                  "primeiro_token": chamada.primeiro_token,
+                                  "tokens_entrada": chamada.tokens_entrada, "tokens_saida": chamada.tokens_saida}
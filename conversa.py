@@ -0,0 +1,95 @@
+import re
+
+# ==============================================================================
+# 1. LIMITES
+# ==============================================================================
+# O prompt de cada mensagem leva: contexto do aluno + resumo das mensagens antigas +
+# janela das mensagens recentes + pergunta. Cada parte tem teto próprio, então o
+# tamanho do prompt não cresce com a conversa. Tokens estimados em ~4 caracteres.
+ORCAMENTO_JANELA = 2000          # tokens das mensagens recentes enviadas por inteiro
+ORCAMENTO_RESUMO = 400           # tokens do resumo das mensagens que saíram da janela
+TOKENS_MENSAGEM = 800            # uma resposta longa entra na janela cortada neste tamanho
+TOKENS_LINHA_RESUMO = 40         # cada mensagem antiga vira uma linha curta do resumo
+MAX_MENSAGENS_SESSAO = 40        # histórico guardado (e mostrado) na sessão
+MAX_CARACTERES_PERGUNTA = 2000   # limite do campo de digitação
+
+CHAVE_RESUMO = "resumo_conversa"
+CHAVE_RESUMIDAS = "mensagens_resumidas"
+QUEM = {"user": "Aluno", "assistant": "Personal"}
+
+def estimar_tokens(texto):
+    return len(texto) // 4 + 1
+
+def _recortar(texto, max_tokens):
+    limite = max_tokens * 4
+    return texto if len(texto) <= limite else texto[:limite].rstrip() + " [...]"
+
+# ==============================================================================
+# 2. RESUMO DAS MENSAGENS ANTIGAS
+# ==============================================================================
+def _linha_resumo(mensagem):
+    """Pergunta do aluno (primeira frase) ou assunto da resposta (primeiro título/linha)."""
+    linhas = [l.strip(" #*-_>") for l in mensagem["content"].strip().splitlines() if l.strip(" #*-_>")]
+    if not linhas: return None
+    if mensagem["role"] == "assistant":
+        titulos = [l.strip(" #*") for l in mensagem["content"].splitlines() if l.lstrip().startswith("#")]
+        texto = titulos[0] if titulos else linhas[0]
+    else:
+        texto = re.split(r"(?<=[.!?])\s", " ".join(linhas), maxsplit=1)[0]
+    return f"{QUEM.get(mensagem['role'], mensagem['role'])}: {_recortar(texto, TOKENS_LINHA_RESUMO)}"
+
+def _resumir(estado, mensagens):
+    """Acrescenta as mensagens ao resumo; acima do orçamento saem as linhas mais antigas."""
+    linhas = list(estado.get(CHAVE_RESUMO, [])) + [l for l in map(_linha_resumo, mensagens) if l]
+    tokens = sum(estimar_tokens(l) for l in linhas)
+    while linhas and tokens > ORCAMENTO_RESUMO:
+        tokens -= estimar_tokens(linhas.pop(0))
+    estado[CHAVE_RESUMO] = linhas
+
+# ==============================================================================
+# 3. HISTÓRICO PARA O PROMPT
+# ==============================================================================
+def preparar(estado):
+    """Aplica os limites ao histórico da sessão e devolve o texto da conversa anterior
+    para o prompt ("" na primeira mensagem).
+
+    As mensagens recentes que cabem em ORCAMENTO_JANELA vão por inteiro; as que saem
+    da janela viram linhas do resumo (uma vez só, na ordem) e, acima de
+    MAX_MENSAGENS_SESSAO, são apagadas da sessão.
+    """
+    mensagens = estado.get("messages", [])
+    resumidas = estado.get(CHAVE_RESUMIDAS, 0)
+
+    excesso = len(mensagens) - MAX_MENSAGENS_SESSAO
+    if excesso > 0:
+        if excesso > resumidas:
+            _resumir(estado, mensagens[resumidas:excesso])
+            resumidas = excesso
+        del mensagens[:excesso]
+        resumidas -= excesso
+
+    # Janela: da mais nova para a mais antiga, até o orçamento (nunca antes das já resumidas)
+    inicio, usados = len(mensagens), 0
+    while inicio > resumidas:
+        custo = estimar_tokens(_recortar(mensagens[inicio - 1]["content"], TOKENS_MENSAGEM))
+        if usados + custo > ORCAMENTO_JANELA: break
+        usados += custo
+        inicio -= 1
+    if inicio > resumidas:
+        _resumir(estado, mensagens[resumidas:inicio])
+    estado[CHAVE_RESUMIDAS] = inicio
+
+    partes = []
+    if estado.get(CHAVE_RESUMO):
+        partes.append("Resumo da conversa anterior:\n" + "\n".join(estado[CHAVE_RESUMO]))
+    if inicio < len(mensagens):
+        partes.append("Mensagens recentes:\n" + "\n\n".join(
+            f"{QUEM.get(m['role'], m['role'])}: {_recortar(m['content'], TOKENS_MENSAGEM)}"
+            for m in mensagens[inicio:]))
+    return "\n\n".join(partes)
+
+def limpar(estado):
+    """Apaga o histórico e o resumo da conversa."""
+    estado["messages"] = []
+    estado[CHAVE_RESUMO] = []
+    estado[CHAVE_RESUMIDAS] = 0
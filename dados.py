@@ -0,0 +1,373 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import sqlite3
+import threading
+import io
+import os
+from collections import OrderedDict, namedtuple
+from contextlib import closing, contextmanager
+
+# ==============================================================================
+# 1. ARQUIVOS E ESQUEMA
+# ==============================================================================
+# O banco SQLite é o armazenamento vivo; a planilha virou formato de importação/exportação.
+DATA_FILE = "Série histórica das medições - Grupo DPJ.xlsx"
+ARQUIVO_BANCO = "medicoes_dpj.db"
+
+COLUNAS = ["Pessoa", "Data", "Peso", "IMC", "Perc_Gordura", "Perc_Musc", "RM", "Idade", "Visceral"]
+COLUNA_META = "Meta de Peso"  # na planilha; no banco as metas ficam na tabela `metas`
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS medicoes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    Pessoa TEXT NOT NULL,
+    Data TEXT NOT NULL,
+    Peso REAL,
+    IMC REAL,
+    Perc_Gordura REAL,
+    Perc_Musc REAL,
+    RM INTEGER,
+    Idade INTEGER,
+    Visceral INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_medicoes_pessoa_data ON medicoes (Pessoa, Data);
+CREATE TABLE IF NOT EXISTS metas (Pessoa TEXT PRIMARY KEY, Meta_Peso REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS controle (chave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+INSERT OR IGNORE INTO controle (chave, valor) VALUES ('versao', 0);
+INSERT OR IGNORE INTO controle (chave, valor) VALUES ('versao_metas', 0);
+"""
+INSERIR = f"INSERT INTO medicoes ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})"
+
+# ==============================================================================
+# 2. CACHE COMPARTILHADO ENTRE SESSÕES
+# ==============================================================================
+# O Streamlit reexecuta o app.py a cada interação, mas este módulo é importado
+# uma única vez por processo: o que fica aqui é compartilhado por todas as sessões.
+# Com vários grupos (grupos.py), só os MAX_BANCOS_CARREGADOS bancos usados mais
+# recentemente ficam em memória; os ociosos são descartados e relidos sob demanda.
+MAX_BANCOS_CARREGADOS = 8
+_trava = threading.Lock()
+_trava_escrita = threading.Lock()
+_cache = OrderedDict()
+_bancos_prontos = set()   # esquema criado
+_bancos_migrados = set()  # migração da planilha conferida
+estatisticas = {"hits": 0, "misses": 0, "bytes_antes": 0, "bytes_depois": 0}
+
+def _conectar(banco):
+    return sqlite3.connect(banco, timeout=30)
+
+@contextmanager
+def _escrita(banco):
+    """Transação de escrita serializada: trava do processo + BEGIN IMMEDIATE (trava entre processos)."""
+    with closing(_conectar_autocommit(banco)) as con, _transacao(con):
+        yield con
+
+def _conectar_autocommit(banco):
+    return sqlite3.connect(banco, timeout=30, isolation_level=None)
+
+@contextmanager
+def _transacao(con):
+    """Transação de escrita numa conexão já aberta (em autocommit)."""
+    with _trava_escrita:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield con
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+def _versao(con, chave='versao'):
+    return con.execute("SELECT valor FROM controle WHERE chave = ?", (chave,)).fetchone()[0]
+
+def _incrementar_versao(con, chave='versao'):
+    con.execute("UPDATE controle SET valor = valor + 1 WHERE chave = ?", (chave,))
+
+def _linhas(df):
+    """Converte o DataFrame em tuplas prontas para o executemany (na ordem de COLUNAS)."""
+    df = df.reindex(columns=COLUNAS)
+    df = df[df['Pessoa'].notna() & df['Data'].notna()]
+    datas = pd.to_datetime(df['Data'], errors='coerce').dt.strftime("%Y-%m-%d %H:%M:%S")
+    df = df.assign(Data=datas).dropna(subset=['Data']).astype(object)
+    return list(df.where(df.notna(), None).itertuples(index=False, name=None))
+
+def _preparar_banco(banco, planilha=None):
+    """Cria o esquema e, com `planilha`, importa a série histórica na primeira vez (migração única).
+
+    Só carregar_com_versao passa a planilha (a do próprio grupo); as demais funções só
+    garantem o esquema, então nunca copiam a planilha de outro grupo para um banco novo.
+    """
+    if banco in _bancos_migrados or (planilha is None and banco in _bancos_prontos): return
+    with _trava:
+        if banco not in _bancos_prontos:
+            with closing(_conectar(banco)) as con:
+                con.execute("PRAGMA journal_mode=WAL")
+                con.executescript(ESQUEMA)
+            _bancos_prontos.add(banco)
+        if planilha is None or banco in _bancos_migrados: return
+        # Checagem e migração na mesma transação: dois processos não importam em dobro
+        with _escrita(banco) as con:
+            migrado = con.execute("SELECT valor FROM controle WHERE chave = 'migrado'").fetchone()
+            metas = con.execute("SELECT valor FROM controle WHERE chave = 'metas'").fetchone()
+            if migrado is None or metas is None:
+                df = pd.read_excel(planilha, engine='openpyxl') if planilha and os.path.exists(planilha) else None
+                if migrado is None: _migrar_planilha(con, df)
+                if metas is None: _migrar_metas(con, df)
+        _bancos_migrados.add(banco)
+
+def _migrar_planilha(con, df):
+    """Copia as medições da planilha (se houver) para o banco e marca a migração como feita."""
+    if df is not None:
+        con.executemany(INSERIR, _linhas(df))
+        _incrementar_versao(con)
+    con.execute("INSERT OR REPLACE INTO controle (chave, valor) VALUES ('migrado', 1)")
+
+def _migrar_metas(con, df):
+    """Copia a coluna "Meta de Peso" da planilha (a última preenchida de cada pessoa)."""
+    if df is not None and COLUNA_META in df:
+        metas = df.assign(Meta=pd.to_numeric(df[COLUNA_META], errors='coerce')).dropna(subset=['Pessoa', 'Meta'])
+        ultimas = metas.groupby('Pessoa')['Meta'].last()
+        con.executemany("INSERT OR REPLACE INTO metas (Pessoa, Meta_Peso) VALUES (?, ?)",
+                        [(str(pessoa), float(meta)) for pessoa, meta in ultimas.items()])
+        if len(ultimas): _incrementar_versao(con, 'versao_metas')
+    con.execute("INSERT OR REPLACE INTO controle (chave, valor) VALUES ('metas', 1)")
+
+def _ler_medicoes(con, where="", params=(), ordem="id", compactar=True):
+    df = pd.read_sql_query(f"SELECT {', '.join(COLUNAS)} FROM medicoes {where} ORDER BY {ordem}", con, params=params)
+    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    return compactar_tipos(df) if compactar else df
+
+# ==============================================================================
+# 3. LEITURA
+# ==============================================================================
+def carregar_com_versao(banco=ARQUIVO_BANCO, planilha=None):
+    """Devolve (DataFrame, versão); só relê o banco quando a versão muda.
+
+    `planilha` é a série histórica do grupo, importada se o banco ainda não a recebeu.
+    """
+    _preparar_banco(banco, planilha)
+    with closing(_conectar(banco)) as con:
+        con.execute("BEGIN")  # leitura consistente: versão e linhas do mesmo instante
+        versao = _versao(con)
+        with _trava:
+            item = _cache.get(banco)
+            if item is not None and item[0] == versao:
+                estatisticas["hits"] += 1
+                _cache.move_to_end(banco)
+                return item[1], versao
+            estatisticas["misses"] += 1
+            df = _ler_medicoes(con, compactar=False)
+            estatisticas["bytes_antes"] = int(df.memory_usage(deep=True).sum())
+            df = compactar_tipos(df)
+            estatisticas["bytes_depois"] = int(df.memory_usage(deep=True).sum())
+            _cache[banco] = (versao, df)
+            _cache.move_to_end(banco)
+            while len(_cache) > MAX_BANCOS_CARREGADOS: _cache.popitem(last=False)
+            return df, versao
+
+def load_data(banco=ARQUIVO_BANCO, planilha=None):
+    """Devolve o DataFrame das medições (compartilhado entre sessões: não alterar no lugar)."""
+    return carregar_com_versao(banco, planilha)[0]
+
+def carregar_metas(banco=ARQUIVO_BANCO):
+    """Dicionário Pessoa -> meta de peso (kg). Versionado à parte (versao_metas)."""
+    _preparar_banco(banco)
+    with closing(_conectar(banco)) as con:
+        return dict(con.execute("SELECT Pessoa, Meta_Peso FROM metas").fetchall())
+
+def versao_metas(banco=ARQUIVO_BANCO):
+    """Versão das metas: muda só quando uma meta é gravada ou removida.
+
+    Entra apenas nas chaves dos caches que usam metas (projeções e gráficos); editar
+    uma meta não invalida o frame das medições, o ranking nem os agregados.
+    """
+    _preparar_banco(banco)
+    with closing(_conectar(banco)) as con:
+        return _versao(con, 'versao_metas')
+
+def carregar_pessoa(pessoa, banco=ARQUIVO_BANCO):
+    """Consulta indexada com o histórico de uma pessoa, ordenado por data."""
+    _preparar_banco(banco)
+    with closing(_conectar(banco)) as con:
+        return _ler_medicoes(con, "WHERE Pessoa = ?", (pessoa,), ordem="Data, id")
+
+# ==============================================================================
+# 4. ÍNDICE POR PESSOA
+# ==============================================================================
+class IndicePessoas:
+    """Histórico de cada pessoa já ordenado por data, para uma versão dos dados.
+
+    Construído uma vez por versão e compartilhado entre sessões: trocar de membro
+    vira uma consulta a dicionário. Os frames e dicionários devolvidos não devem
+    ser alterados no lugar.
+    """
+
+    def __init__(self, df):
+        self._ordenado = df.sort_values('Data', kind='stable')
+        self._posicoes = self._ordenado.groupby('Pessoa', sort=False, observed=True).indices
+        self.pessoas = list(df['Pessoa'].dropna().unique())
+        self._historicos = {}
+        self._ultimos = {}
+
+    def historico(self, pessoa):
+        """Histórico da pessoa com os tipos originais (float64), para telas e gráficos."""
+        if pessoa not in self._historicos:
+            posicoes = self._posicoes.get(pessoa)
+            historico = self._ordenado.iloc[posicoes] if posicoes is not None else self._ordenado.iloc[:0]
+            self._historicos[pessoa] = expandir_tipos(historico)
+        return self._historicos[pessoa]
+
+    def ultimo_registro(self, pessoa):
+        if pessoa not in self._ultimos:
+            historico = self.historico(pessoa)
+            self._ultimos[pessoa] = historico.iloc[-1].to_dict() if not historico.empty else {}
+        return self._ultimos[pessoa]
+
+@st.cache_resource(max_entries=2 * MAX_BANCOS_CARREGADOS)
+def indice_pessoas(_df, versao, banco=ARQUIVO_BANCO):
+    return IndicePessoas(_df)
+
+# ==============================================================================
+# 5. GRAVAÇÃO
+# ==============================================================================
+def invalidar(banco=ARQUIVO_BANCO):
+    with _trava:
+        _cache.pop(banco, None)
+
+def inserir_medicao(registro, banco=ARQUIVO_BANCO):
+    """Acrescenta uma única medição (sem reescrever o histórico).
+
+    Devolve a nova versão dos dados (a anterior é sempre versão - 1) ou False se falhar.
+    """
+    _preparar_banco(banco)
+    try:
+        with _escrita(banco) as con:
+            con.executemany(INSERIR, _linhas(pd.DataFrame([registro])))
+            _incrementar_versao(con)
+            return _versao(con)
+    except sqlite3.Error as e:
+        st.error(f"⚠️ Não foi possível salvar a medição: {e}")
+        return False
+
+def salvar_meta(pessoa, meta, banco=ARQUIVO_BANCO):
+    """Grava (ou, com meta None, remove) a meta de peso; devolve a nova versão das metas ou False."""
+    _preparar_banco(banco)
+    try:
+        with _escrita(banco) as con:
+            if meta is None: con.execute("DELETE FROM metas WHERE Pessoa = ?", (pessoa,))
+            else: con.execute("INSERT OR REPLACE INTO metas (Pessoa, Meta_Peso) VALUES (?, ?)", (pessoa, float(meta)))
+            _incrementar_versao(con, 'versao_metas')
+            return _versao(con, 'versao_metas')
+    except sqlite3.Error as e:
+        st.error(f"⚠️ Não foi possível salvar a meta: {e}")
+        return False
+
+def save_data(df, banco=ARQUIVO_BANCO):
+    """Substitui todo o conteúdo do banco pelo DataFrame informado."""
+    _preparar_banco(banco)
+    try:
+        with _escrita(banco) as con:
+            con.execute("DELETE FROM medicoes")
+            con.executemany(INSERIR, _linhas(df))
+            _incrementar_versao(con)
+        return True
+    except sqlite3.Error as e:
+        st.error(f"⚠️ Não foi possível salvar os dados: {e}")
+        return False
+    finally:
+        invalidar(banco)
+
+# ==============================================================================
+# 6. IMPORTAÇÃO / EXPORTAÇÃO EXCEL
+# ==============================================================================
+ResultadoImportacao = namedtuple('ResultadoImportacao', ['lidas', 'importadas', 'duplicadas', 'invalidas'])
+
+# Medições novas = primeira ocorrência de cada (Pessoa, Data) do arquivo que ainda não
+# está no banco; o NOT EXISTS é resolvido pelo idx_medicoes_pessoa_data, sem varrer a tabela
+MESCLAR = f"""
+INSERT INTO medicoes ({', '.join(COLUNAS)})
+SELECT {', '.join(COLUNAS)} FROM temp.importacao i
+WHERE i.rowid = (SELECT MIN(rowid) FROM temp.importacao j WHERE j.Pessoa = i.Pessoa AND j.Data = i.Data)
+  AND NOT EXISTS (SELECT 1 FROM medicoes m WHERE m.Pessoa = i.Pessoa AND m.Data = i.Data)
+ORDER BY i.rowid
+"""
+
+def importar_medicoes(blocos, banco=ARQUIVO_BANCO):
+    """Importa medições de uma sequência de DataFrames (blocos de um arquivo grande).
+
+    Os blocos vão para uma tabela temporária à medida que chegam, sem travar o banco;
+    a mescla com o histórico é uma única transação. Linhas sem Pessoa/Data contam como
+    inválidas; (Pessoa, Data) já existentes ou repetidos no arquivo, como duplicadas.
+    """
+    _preparar_banco(banco)
+    lidas = invalidas = 0
+    with closing(_conectar_autocommit(banco)) as con:
+        con.execute(f"CREATE TEMP TABLE importacao AS SELECT {', '.join(COLUNAS)} FROM medicoes WHERE 0")
+        for bloco in blocos:
+            linhas = _linhas(bloco)
+            lidas += len(bloco)
+            invalidas += len(bloco) - len(linhas)
+            con.execute("BEGIN")
+            con.executemany(INSERIR.replace("INTO medicoes", "INTO temp.importacao"), linhas)
+            con.execute("COMMIT")
+        con.execute("CREATE INDEX temp.idx_importacao ON importacao (Pessoa, Data)")
+        with _transacao(con):
+            importadas = con.execute(MESCLAR).rowcount
+            if importadas: _incrementar_versao(con)
+    return ResultadoImportacao(lidas, importadas, lidas - invalidas - importadas, invalidas)
+
+def exportar_excel(banco=ARQUIVO_BANCO):
+    """Gera a planilha (em bytes) no mesmo formato da série histórica.
+
+    A meta de cada pessoa vai na coluna "Meta de Peso" da primeira medição dela.
+    """
+    buffer = io.BytesIO()
+    df = expandir_tipos(load_data(banco))
+    primeiras = ~df['Pessoa'].duplicated()
+    df[COLUNA_META] = df['Pessoa'].map(carregar_metas(banco)).where(primeiras)
+    df.to_excel(buffer, index=False, engine='openpyxl')
+    return buffer.getvalue()
+
+# ==============================================================================
+# 7. TIPOS COMPACTOS (MEMÓRIA)
+# ==============================================================================
+# O frame em cache é um só por processo, mas cresce com o histórico. Orçamento por
+# 100 mil medições (memory_usage deep, de 200 a 5000 membros):
+#   tipos do SQLite (texto + float64/int64) ...... ~8,5 MB
+#   compacto (category + float32 + int8/int16) ... ~3,0 MB (72 -> 30 bytes por linha)
+# As métricas são gravadas com até CASAS_DECIMAIS casas; em float32 elas voltam ao
+# mesmo float64 com valores_float64(), então ranking e gráficos não mudam. Uma coluna
+# que não volta exata (mais casas, valores enormes) fica em float64.
+CASAS_DECIMAIS = 3
+METRICAS = ["Peso", "IMC", "Perc_Gordura", "Perc_Musc"]
+INTEIROS = ["RM", "Idade", "Visceral"]
+
+def compactar_tipos(df):
+    """Pessoa como category, métricas em float32 e inteiros pequenos em int8/int16."""
+    df = df.copy()
+    df['Pessoa'] = df['Pessoa'].astype('category')
+    df['Data'] = pd.to_datetime(df['Data'], errors='coerce')
+    for coluna in METRICAS + INTEIROS:
+        valores = pd.to_numeric(df[coluna], errors='coerce').astype('float64')
+        if coluna in INTEIROS and valores.notna().all() and (valores % 1 == 0).all():
+            df[coluna] = pd.to_numeric(valores.astype('int64'), downcast='integer')
+            continue
+        compacto = valores.astype('float32')
+        if np.array_equal(compacto.astype('float64').round(CASAS_DECIMAIS), valores, equal_nan=True):
+            df[coluna] = compacto
+        else:
+            df[coluna] = valores
+    return df
+
+def valores_float64(serie):
+    """Array float64 da coluna; float32 volta ao valor decimal gravado."""
+    valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+    return valores.round(CASAS_DECIMAIS) if serie.dtype == np.float32 else valores
+
+def expandir_tipos(df):
+    """Cópia com os tipos de leitura (texto, float64, int64), para exibir e exportar."""
+    df = df.astype({coluna: 'int64' for coluna in INTEIROS if df[coluna].dtype.kind == 'i'})
+    for coluna in METRICAS + INTEIROS:
+        if df[coluna].dtype == np.float32: df[coluna] = valores_float64(df[coluna])
+    return df.astype({'Pessoa': str})
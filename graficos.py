@@ -0,0 +1,70 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+from cache_lru import CacheLRU
+
+# ==============================================================================
+# 1. FIGURAS DA TELA INDIVIDUAL
+# ==============================================================================
+def construir_figuras(df_person, suavizado=None, projecao=None):
+    """Monta as quatro figuras do dashboard individual a partir do histórico ordenado.
+
+    `suavizado` (linhas da pessoa em analises.suavizar) acrescenta as curvas EWMA e
+    `projecao` (linha da pessoa em analises.projetar_metas), a meta e a data prevista.
+    """
+    curr = df_person.iloc[-1]
+
+    fig_peso = go.Figure()
+    fig_peso.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Peso"], mode='lines+markers', name="Peso",
+                                 line=dict(color='#3B82F6', width=4, shape='spline'),
+                                 fill='tozeroy', fillcolor='rgba(59, 130, 246, 0.1)'))
+    if suavizado is not None:
+        fig_peso.add_trace(go.Scatter(x=df_person["Data"], y=suavizado["Peso_EWMA"], name="Tendência",
+                                     line=dict(color='#1E3A8A', width=2, dash='dash')))
+    if projecao is not None and pd.notna(projecao["Meta_Peso"]):
+        fig_peso.add_hline(y=projecao["Meta_Peso"], line=dict(color='#F59E0B', dash='dot'),
+                           annotation_text=f"Meta {projecao['Meta_Peso']:g} kg")
+        if projecao["Status"] == "projetada":
+            fig_peso.add_trace(go.Scatter(x=[curr["Data"], projecao["Data_Prevista"]],
+                                         y=[projecao["Peso_Tendencia"], projecao["Meta_Peso"]], name="Projeção",
+                                         mode='lines+markers', line=dict(color='#F59E0B', width=2, dash='dot')))
+    fig_peso.update_layout(title="Tendência de Peso", plot_bgcolor='white', margin=dict(t=40, b=0))
+
+    fig_comp = go.Figure()
+    fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Perc_Gordura"], name="% Gordura", 
+                                 line=dict(color='#EF4444', width=3, shape='spline')))
+    fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=df_person["Perc_Musc"], name="% Músculo", 
+                                 line=dict(color='#10B981', width=3, shape='spline')))
+    if suavizado is not None:
+        fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=suavizado["Perc_Gordura_EWMA"], name="% Gordura (tendência)",
+                                     line=dict(color='#EF4444', width=1.5, dash='dash')))
+        fig_comp.add_trace(go.Scatter(x=df_person["Data"], y=suavizado["Perc_Musc_EWMA"], name="% Músculo (tendência)",
+                                     line=dict(color='#10B981', width=1.5, dash='dash')))
+    fig_comp.update_layout(title="Composição Corporal", plot_bgcolor='white', margin=dict(t=40, b=0))
+
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number", value=curr['IMC'],
+        gauge={'axis': {'range': [15, 40]}, 'bar': {'color': "#1E293B"},
+               'steps': [{'range': [0, 25], 'color': "#D1FAE5"}, {'range': [25, 30], 'color': "#FEF3C7"}, {'range': [30, 40], 'color': "#FEE2E2"}]}))
+    fig_gauge.update_layout(height=600, title="IMC")
+
+    fig_rm = px.bar(df_person.tail(8), x="Data", y="RM", title="Taxa Metabólica (kcal)", color_discrete_sequence=['#8B5CF6'])
+    fig_rm.update_layout(plot_bgcolor='rgba(0,0,0,0)')
+
+    return {"peso": fig_peso, "composicao": fig_comp, "imc": fig_gauge, "rm": fig_rm}
+
+# ==============================================================================
+# 2. CACHE POR (PESSOA, VERSÃO DOS DADOS)
+# ==============================================================================
+# Compartilhado entre sessões; os membros mais acessados ficam, os demais são descartados
+cache_figuras = CacheLRU(max_itens=64)
+
+def figuras_individuais(df_person, pessoa, versao, banco=None, suavizado=None, projecao=None, versao_metas=0):
+    """Figuras da pessoa para a versão dos dados do grupo (`banco`): só são montadas quando o
+    histórico ou as metas (linha da meta no gráfico de peso) mudam.
+
+    Devolve (figuras, segundos economizados nesta execução). As figuras são
+    compartilhadas e não devem ser alteradas no lugar.
+    """
+    return cache_figuras.obter((banco, pessoa, versao, versao_metas), lambda: construir_figuras(df_person, suavizado, projecao))
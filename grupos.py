@@ -0,0 +1,59 @@
+import streamlit as st
+from collections import namedtuple
+
+import dados
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO DOS GRUPOS
+# ==============================================================================
+# Um processo atende vários grupos, cada um com o próprio banco e as próprias senhas.
+# Nos secrets:
+#
+#   [grupos.dpj]
+#   nome = "DPJ"
+#   banco = "medicoes_dpj.db"
+#   planilha = "Série histórica das medições - Grupo DPJ.xlsx"   # migração inicial
+#   inicio_competicao = "2025-01-06"                              # opcional
+#   [grupos.dpj.passwords]
+#   admin = "..."
+#
+# Sem [grupos], o painel tem só o grupo DPJ, com as senhas de [passwords].
+Grupo = namedtuple('Grupo', ['chave', 'nome', 'banco', 'planilha', 'usuarios', 'inicio_competicao'],
+                   defaults=[None])
+
+def _senhas_globais():
+    try:
+        return dict(st.secrets["passwords"])
+    except:
+        # Fallback apenas para não quebrar se você esquecer de configurar localmente
+        return {"admin": "admin123"}
+
+def carregar_grupos():
+    """Dicionário chave -> Grupo, na ordem dos secrets."""
+    try:
+        configurados = st.secrets["grupos"]
+    except:
+        configurados = {}
+    grupos = {}
+    for chave, cfg in configurados.items():
+        grupos[chave] = Grupo(chave, cfg.get("nome", chave), cfg.get("banco", f"medicoes_{chave}.db"),
+                              cfg.get("planilha"), dict(cfg.get("passwords", {})), cfg.get("inicio_competicao"))
+    if not grupos:
+        grupos["dpj"] = Grupo("dpj", "DPJ", dados.ARQUIVO_BANCO, dados.DATA_FILE, _senhas_globais())
+    return grupos
+
+# ==============================================================================
+# 2. GRUPO DA SESSÃO
+# ==============================================================================
+def grupo_da_sessao(grupos):
+    """Grupo escolhido na barra lateral (widget de chave 'grupo'); o primeiro por padrão."""
+    chave = st.session_state.get('grupo')
+    if chave not in grupos:
+        chave = st.session_state['grupo'] = next(iter(grupos))
+    return grupos[chave]
+
+def trocar_grupo():
+    """Callback do seletor: as senhas são por grupo, então a troca encerra o login."""
+    st.session_state['logado'] = False
+    st.session_state['usuario_atual'] = ""
+    st.session_state.pop('exportacao', None)
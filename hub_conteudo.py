@@ -77,6 +77,12 @@ def exibir_hub():
 #   with st.spinner("Sincronizando com o YouTube..."):
     db_validado = validar_biblioteca_videos(db_raw)
 
+    sugestoes_do_dia(db_validado)
+    calculadora_hidratacao()
+
+# Escolher a modalidade ou mudar o peso reexecuta só o fragmento, não o app inteiro
+@st.fragment
+def sugestoes_do_dia(db_validado):
     # 3. Escolha de Modalidade
     modalidades = list(db_validado.keys())
     
@@ -114,7 +120,8 @@ def exibir_hub():
                 st.video(url)
                 st.caption(f"✅ Fonte: Playlist Curada | Sugestão {i+1}")
 
-    # 6. Calculadora de Água
+@st.fragment
+def calculadora_hidratacao():
     st.markdown("---")
     st.subheader("💧 Meta de Hidratação")
     with st.expander("Calcular minha meta", expanded=True):
@@ -0,0 +1,147 @@
+import streamlit as st
+import pandas as pd
+import argparse
+import sqlite3
+import csv
+import io
+import re
+import unicodedata
+
+import dados
+
+# ==============================================================================
+# 1. MAPEAMENTO DE COLUNAS
+# ==============================================================================
+# Cabeçalhos das exportações das balanças de bioimpedância (normalizados: minúsculas,
+# sem acento e só letras/números) -> colunas do painel
+APELIDOS = {
+    "Pessoa": ["pessoa", "nome", "name", "membro", "usuario", "user", "cliente"],
+    "Data": ["data", "date", "datahora", "dataehora", "datetime", "datadamedicao", "time"],
+    "Peso": ["peso", "pesokg", "weight", "weightkg"],
+    "IMC": ["imc", "bmi"],
+    "Perc_Gordura": ["percgordura", "gordura", "gorduracorporal", "bodyfat", "bodyfatpercent", "fat", "fatpercent"],
+    "Perc_Musc": ["percmusc", "musculo", "massamuscular", "musculoesqueletico", "muscle", "musclepercent",
+                  "skeletalmuscle"],
+    "RM": ["rm", "taxametabolica", "taxametabolicabasal", "tmb", "metabolismobasal", "bmr", "kcal"],
+    "Idade": ["idade", "age", "idadecorporal", "idademetabolica", "bodyage", "metabolicage"],
+    "Visceral": ["visceral", "gorduravisceral", "visceralfat"],
+}
+_COLUNA_DO_APELIDO = {apelido: coluna for coluna, apelidos in APELIDOS.items() for apelido in apelidos}
+
+def _normalizar(cabecalho):
+    texto = unicodedata.normalize("NFKD", str(cabecalho)).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", texto.lower())
+
+def mapear_colunas(cabecalhos):
+    """Dicionário cabeçalho do arquivo -> coluna do painel (a primeira ocorrência vence)."""
+    mapa = {}
+    for cabecalho in cabecalhos:
+        coluna = _COLUNA_DO_APELIDO.get(_normalizar(cabecalho))
+        if coluna and coluna not in mapa.values():
+            mapa[cabecalho] = coluna
+    faltando = {"Pessoa", "Data"} - set(mapa.values())
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias não encontradas: {', '.join(sorted(faltando))}")
+    return mapa
+
+def _datas(valores):
+    """Datas ISO (2025-01-31) ou no padrão brasileiro (31/01/2025), com ou sem hora, no mesmo arquivo.
+
+    format="mixed": cada valor é interpretado sozinho (sem ele, o formato do primeiro vale
+    para todos e "31/01/2025 08:30" vira NaT num arquivo que começa só com datas).
+    """
+    iso = valores.astype(str).str.match(r"\d{4}-")
+    datas = pd.to_datetime(valores.where(iso), format="ISO8601", errors='coerce')
+    return datas.fillna(pd.to_datetime(valores.where(~iso), format="mixed", dayfirst=True, errors='coerce'))
+
+def _padronizar(bloco, mapa):
+    """Renomeia, converte datas (dia primeiro) e números (vírgula decimal) de um bloco."""
+    bloco = bloco[list(mapa)].rename(columns=mapa)
+    if not pd.api.types.is_datetime64_any_dtype(bloco['Data']):
+        bloco['Data'] = _datas(bloco['Data'])
+    for coluna in set(mapa.values()) - {"Pessoa", "Data"}:
+        if bloco[coluna].dtype == object or pd.api.types.is_string_dtype(bloco[coluna]):
+            bloco[coluna] = bloco[coluna].astype(str).str.replace(",", ".", regex=False)
+        bloco[coluna] = pd.to_numeric(bloco[coluna], errors='coerce')
+    bloco['Pessoa'] = bloco['Pessoa'].where(bloco['Pessoa'].isna(), bloco['Pessoa'].astype(str).str.strip())
+    return bloco.reindex(columns=dados.COLUNAS)
+
+# ==============================================================================
+# 2. LEITURA EM BLOCOS
+# ==============================================================================
+TAMANHO_BLOCO = 50_000
+
+def _texto(arquivo):
+    """Arquivo em modo texto (aceita caminho, arquivo binário ou UploadedFile)."""
+    if isinstance(arquivo, str): return open(arquivo, encoding="utf-8-sig", newline="")
+    arquivo.seek(0)
+    return io.TextIOWrapper(arquivo, encoding="utf-8-sig", newline="")
+
+def blocos_csv(arquivo, tamanho=TAMANHO_BLOCO):
+    """DataFrames de até `tamanho` linhas; o separador (, ou ;) é detectado no cabeçalho."""
+    texto = _texto(arquivo)
+    try:
+        primeira = texto.readline()
+        texto.seek(0)
+        separador = ";" if primeira.count(";") > primeira.count(",") else ","
+        mapa = mapear_colunas(next(csv.reader([primeira], delimiter=separador)))
+        leitor = pd.read_csv(texto, sep=separador, usecols=list(mapa), chunksize=tamanho, dtype=str)
+        for bloco in leitor:
+            yield _padronizar(bloco, mapa)
+    finally:
+        # Arquivo recebido aberto (upload) continua aberto para quem o passou
+        if isinstance(arquivo, str): texto.close()
+        else: texto.detach()
+
+def blocos_xlsx(arquivo, tamanho=TAMANHO_BLOCO):
+    """DataFrames de até `tamanho` linhas da primeira aba, lida em modo streaming (read_only)."""
+    from openpyxl import load_workbook
+    livro = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        linhas = livro.worksheets[0].iter_rows(values_only=True)
+        cabecalhos = list(next(linhas, ()))
+        mapa = mapear_colunas([c for c in cabecalhos if c is not None])
+        posicoes = [cabecalhos.index(c) for c in mapa]
+        lote = []
+        for linha in linhas:
+            lote.append([linha[i] if i < len(linha) else None for i in posicoes])
+            if len(lote) == tamanho:
+                yield _padronizar(pd.DataFrame(lote, columns=list(mapa)), mapa)
+                lote = []
+        if lote: yield _padronizar(pd.DataFrame(lote, columns=list(mapa)), mapa)
+    finally:
+        livro.close()
+
+def importar_arquivo(arquivo, nome, banco=dados.ARQUIVO_BANCO, tamanho=TAMANHO_BLOCO):
+    """Importa um CSV/xlsx exportado pela balança; devolve dados.ResultadoImportacao."""
+    leitor = blocos_xlsx if nome.lower().endswith((".xlsx", ".xlsm")) else blocos_csv
+    return dados.importar_medicoes(leitor(arquivo, tamanho), banco)
+
+# ==============================================================================
+# 3. INTERFACE (SÓ ADMIN)
+# ==============================================================================
+def exibir_importacao(banco=dados.ARQUIVO_BANCO):
+    with st.expander("📥 Importar medições"):
+        arquivo = st.file_uploader("Exportação da balança (CSV ou Excel)", type=["csv", "xlsx"])
+        if arquivo and st.button("Importar", use_container_width=True):
+            try:
+                with st.spinner("Importando..."):
+                    resultado = importar_arquivo(arquivo, arquivo.name, banco)
+            except (ValueError, sqlite3.Error) as e:
+                st.error(f"⚠️ Não foi possível importar: {e}")
+                return
+            st.success(f"{resultado.importadas} medições importadas. Recarregue a página.")
+            if resultado.duplicadas or resultado.invalidas:
+                st.caption(f"Ignoradas: {resultado.duplicadas} já existentes e {resultado.invalidas} sem pessoa/data.")
+
+# ==============================================================================
+# 4. LINHA DE COMANDO (ARQUIVOS GRANDES NO SERVIDOR)
+# ==============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa medições de um CSV/xlsx para o banco do painel.")
+    parser.add_argument("arquivo")
+    parser.add_argument("--banco", default=dados.ARQUIVO_BANCO)
+    args = parser.parse_args()
+    resultado = importar_arquivo(args.arquivo, args.arquivo, args.banco)
+    print(f"{resultado.importadas} importadas, {resultado.duplicadas} duplicadas, "
+          f"{resultado.invalidas} inválidas ({resultado.lidas} lidas)")
@@ -1,17 +1,14 @@
 import streamlit as st
-import google.generativeai as genai
 import PIL.Image
-import time
+
+import cliente_ia
 
 def configurar_ia():
-    try:
-        # Busca a chave no cofre de segredos do Streamlit
-        api_key = st.secrets["GOOGLE_API_KEY"]
-        genai.configure(api_key=api_key)
+    # Mesmo cliente do assistente, configurado uma vez por processo
+    if cliente_ia.configurar():
         return True
-    except Exception as e:
-        st.error("❌ Erro: Chave API não configurada nos Secrets.")
-        return False
+    st.error("❌ Erro: Chave API não configurada nos Secrets.")
+    return False
         
 
 def exibir_nutri_vision(dados_aluno):
@@ -50,23 +47,11 @@ def exibir_nutri_vision(dados_aluno):
                 """
 
                 resposta_box = st.empty()
-                full_text = ""
 
-                with st.spinner('Processando imagem com Gemini 2.5...'):
+                with st.spinner('Processando imagem com o Gemini...'):
                     try:
-                        # --- ATUALIZAÇÃO DO MODELO AQUI ---
-                        model = genai.GenerativeModel('gemini-2.5-flash')
-                        
-                        response = model.generate_content(
-                            [prompt_sistema, image],
-                            stream=True
-                        )
-                        
-                        for chunk in response:
-                            full_text += chunk.text
-                            resposta_box.markdown(full_text + "▌")
-                        
-                        resposta_box.markdown(full_text)
+                        # O modelo é definido em cliente_ia (GEMINI_MODEL nos Secrets)
+                        cliente_ia.renderizar_streaming(cliente_ia.gerar([prompt_sistema, image]), resposta_box)
                         st.success("Análise concluída!")
 
                     except Exception as e:
@@ -0,0 +1,66 @@
+import threading
+import json
+import time
+import os
+from collections import deque
+from datetime import datetime
+
+# ==============================================================================
+# 1. CONFIGURAÇÃO
+# ==============================================================================
+# PAINEL_PERFIL=1 liga o perfil para todas as sessões; o admin também pode ligar só
+# para a própria sessão pelo painel. PAINEL_PERFIL_LOG grava cada execução (JSON por linha).
+ATIVO_PARA_TODOS = os.environ.get("PAINEL_PERFIL") == "1"
+ARQUIVO_LOG = os.environ.get("PAINEL_PERFIL_LOG")
+MAX_HISTORICO = 50
+
+_trava_log = threading.Lock()
+
+# ==============================================================================
+# 2. MEDIÇÃO POR EXECUÇÃO (RERUN)
+# ==============================================================================
+class Execucao:
+    """Tempos de uma execução do app.py, medidos por marcos.
+
+    Cada marco(nome) registra o tempo gasto desde o marco anterior, então basta
+    chamar marco() ao fim de cada seção, sem reindentar o código.
+    """
+    ativa = True
+
+    def __init__(self):
+        self.inicio = self._ultimo = time.perf_counter()
+        self.secoes = {}
+
+    def marco(self, nome):
+        agora = time.perf_counter()
+        self.secoes[nome] = self.secoes.get(nome, 0.0) + (agora - self._ultimo) * 1000
+        self._ultimo = agora
+
+    def total_ms(self):
+        return (self._ultimo - self.inicio) * 1000
+
+class _ExecucaoDesligada:
+    """Usada com o perfil desligado: marco() não faz nada."""
+    ativa = False
+
+    def marco(self, nome):
+        pass
+
+_DESLIGADA = _ExecucaoDesligada()
+
+def iniciar(ativo_na_sessao=False):
+    return Execucao() if (ATIVO_PARA_TODOS or ativo_na_sessao) else _DESLIGADA
+
+def finalizar(execucao, historico, tela="", usuario=""):
+    """Guarda a execução no histórico da sessão (deque) e, se configurado, no log."""
+    if not execucao.ativa: return
+    registro = {"data": datetime.now().isoformat(timespec="seconds"), "tela": tela, "usuario": usuario,
+                "total_ms": round(execucao.total_ms(), 2),
+                "secoes_ms": {nome: round(ms, 2) for nome, ms in execucao.secoes.items()}}
+    historico.append(registro)
+    if ARQUIVO_LOG:
+        with _trava_log, open(ARQUIVO_LOG, "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+def novo_historico():
+    return deque(maxlen=MAX_HISTORICO)
@@ -0,0 +1,249 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import threading
+from collections import namedtuple, OrderedDict
+
+import anomalias
+import dados
+
+# ==============================================================================
+# 1. PESOS DO INDICADOR (ver regulamento.py)
+# ==============================================================================
+PESO_MUSCULO = 0.4
+PESO_GORDURA = -0.3
+PESO_VISCERAL = -0.2
+PESO_PESO = -0.1
+
+# Janela de comparação: últimos `dias` antes da última medição de cada pessoa e/ou
+# intervalo fixo de datas [inicio, fim]. Janela() = todo o período.
+Janela = namedtuple('Janela', ['dias', 'inicio', 'fim'], defaults=[None, None, None])
+
+COLUNAS_RANKING = ['Pessoa', 'Ganho_Musculo', 'Perda_Gordura', 'Peso_Atual', 'Data_Referencia',
+                   'Delta_Musculo:', 'Delta_Gordura:', 'Delta_Visceral:', 'Delta_Peso:', 'Indicador']
+
+# ==============================================================================
+# 2. ORDENAÇÃO E LIMITES DE CADA PESSOA
+# ==============================================================================
+def _ordenar(df):
+    """Ordena por (Pessoa, Data) uma única vez e devolve os arrays e os limites de cada grupo.
+
+    Datas vazias (NaT) vão para o fim do grupo, como no sort_values.
+    """
+    validos = df[df['Pessoa'].notna()]
+    codigos, pessoas = pd.factorize(validos['Pessoa'], sort=True)
+    datas = validos['Data'].to_numpy(dtype='datetime64[ns]')
+    chave = datas.view('i8').copy()
+    chave[np.isnat(datas)] = np.iinfo(np.int64).max
+
+    ordem = np.lexsort((chave, codigos))
+    codigos, chave, datas = codigos[ordem], chave[ordem], datas[ordem]
+    inicio = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]]) if len(codigos) else np.array([], dtype=int)
+    fim = np.r_[inicio[1:], len(codigos)] - 1
+    return validos, ordem, codigos, chave, datas, pessoas, inicio, fim
+
+def _primeiro_desde(codigos, chave, datas, inicio, fim, dias):
+    """Índice da primeira medição de cada pessoa com Data >= última Data - dias.
+
+    Um único searchsorted sobre a chave composta (pessoa, posição da data) resolve
+    todos os grupos de uma vez.
+    """
+    datas_unicas = np.unique(chave)
+    posicao = np.searchsorted(datas_unicas, chave)
+    composta = codigos.astype(np.int64) * (len(datas_unicas) + 1) + posicao
+
+    corte = (datas[fim] - np.timedelta64(dias, 'D')).view('i8')
+    alvo = codigos[fim].astype(np.int64) * (len(datas_unicas) + 1) + np.searchsorted(datas_unicas, corte)
+    primeiro = np.searchsorted(composta, alvo, side='left')
+    # Sem data de referência (NaT) não há corte: usa a primeira medição, como antes
+    return np.where(np.isnat(datas[fim]), inicio, primeiro)
+
+# ==============================================================================
+# 3. RANKING VETORIZADO
+# ==============================================================================
+def calcular_ranking(df, dias=None, inicio=None, fim=None):
+    """Calcula o ranking de todos os membros de uma vez.
+
+    Compara a última medição de cada pessoa com a primeira (ou, com `dias`, com a
+    primeira dentro dos últimos `dias` antes da última). Com `inicio`/`fim` só entram
+    as medições do intervalo (datas inclusivas). Mesmos números da antiga
+    filtrar_por_periodo aplicada com groupby().apply().
+    """
+    if inicio is not None: df = df[df['Data'] >= pd.Timestamp(inicio)]
+    if fim is not None: df = df[df['Data'] < pd.Timestamp(fim) + pd.Timedelta(days=1)]
+    if df.empty: return pd.DataFrame(columns=COLUNAS_RANKING)
+
+    validos, ordem, codigos, chave, datas, pessoas, inicio, fim = _ordenar(df)
+    primeiro = inicio if dias is None else _primeiro_desde(codigos, chave, datas, inicio, fim, dias)
+    linha_ultimo, linha_primeiro = ordem[fim], ordem[primeiro]
+
+    def coluna(nome):
+        valores = dados.valores_float64(validos[nome])
+        return valores[linha_ultimo], valores[linha_primeiro]
+
+    musc_u, musc_p = coluna('Perc_Musc')
+    gord_u, gord_p = coluna('Perc_Gordura')
+    visc_u, visc_p = coluna('Visceral')
+    peso_u, peso_p = coluna('Peso')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d_musculo = (musc_u - musc_p) / musc_p
+        d_gordura = (gord_u - gord_p) / gord_p
+        d_visceral = (visc_u - visc_p) / visc_p
+        d_peso = (peso_u - peso_p) / peso_p
+    indicador = 100*((d_musculo*PESO_MUSCULO)+(d_gordura*PESO_GORDURA)+(d_visceral*PESO_VISCERAL)+(d_peso*PESO_PESO))
+
+    return pd.DataFrame({
+        'Pessoa': np.asarray(pessoas, dtype=object),
+        'Ganho_Musculo': musc_u - musc_p,
+        'Perda_Gordura': gord_p - gord_u,
+        'Peso_Atual': peso_u,
+        'Data_Referencia': datas[primeiro],
+        'Delta_Musculo:': d_musculo,
+        'Delta_Gordura:': d_gordura,
+        'Delta_Visceral:': d_visceral,
+        'Delta_Peso:': d_peso,
+        'Indicador': indicador})
+
+# ==============================================================================
+# 4. TRAJETÓRIA DO INDICADOR
+# ==============================================================================
+def trajetoria_indicador(df):
+    """Indicador acumulado de cada pessoa em cada uma das suas medições.
+
+    Cada linha é comparada com a primeira medição da pessoa (a mesma base do ranking
+    de todo o período), com operações sobre arrays inteiros, sem laço por data.
+    """
+    if df.empty: return pd.DataFrame(columns=['Pessoa', 'Data', 'Indicador'])
+
+    validos, ordem, codigos, chave, datas, pessoas, inicio, fim = _ordenar(df)
+    base = np.repeat(ordem[inicio], fim - inicio + 1)  # linha de referência de cada medição
+
+    def delta(nome):
+        valores = dados.valores_float64(validos[nome])
+        return (valores[ordem] - valores[base]) / valores[base]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        indicador = 100*((delta('Perc_Musc')*PESO_MUSCULO)+(delta('Perc_Gordura')*PESO_GORDURA)
+                         +(delta('Visceral')*PESO_VISCERAL)+(delta('Peso')*PESO_PESO))
+
+    traj = pd.DataFrame({'Pessoa': np.asarray(pessoas, dtype=object)[codigos], 'Data': datas, 'Indicador': indicador})
+    return traj[traj['Data'].notna()].reset_index(drop=True)
+
+def posicoes_por_data(traj):
+    """Posição no ranking de cada pessoa em cada data de medição do grupo (1 = líder).
+
+    Entre duas medições vale o último Indicador da pessoa; antes da primeira ela não
+    aparece. Devolve uma tabela datas x pessoas.
+    """
+    tabela = traj.pivot_table(index='Data', columns='Pessoa', values='Indicador', aggfunc='last')
+    return tabela.ffill().rank(axis=1, ascending=False, method='min')
+
+@st.cache_resource(max_entries=2 * dados.MAX_BANCOS_CARREGADOS)
+def trajetoria_em_cache(_df, versao, banco=dados.ARQUIVO_BANCO):
+    """(trajetória, posições por data) calculadas uma vez por versão dos dados."""
+    traj = trajetoria_indicador(_df)
+    return traj, posicoes_por_data(traj)
+
+# ==============================================================================
+# 5. RANKING INCREMENTAL POR JANELA
+# ==============================================================================
+class TabelaRanking:
+    """Ranking de uma janela mantido entre inserções.
+
+    Cada linha só depende do histórico da própria pessoa, então uma nova medição
+    recalcula apenas a linha de quem mediu; o resto da tabela é reaproveitado.
+    Com `sem_suspeitas`, `df` já vem sem as medições suspeitas (anomalias.py).
+    """
+
+    def __init__(self, df, versao, janela, sem_suspeitas=False):
+        self.janela = janela
+        self.versao = versao
+        self.sem_suspeitas = sem_suspeitas
+        self.linhas = calcular_ranking(df, *janela).set_index('Pessoa')
+        self._resultado = None
+
+    def atualizar_pessoa(self, historico, pessoa, versao):
+        """Recalcula a linha de `pessoa` a partir do histórico dela (e só dele).
+
+        As marcações de suspeita também só dependem do histórico da pessoa.
+        """
+        if self.sem_suspeitas: historico = historico[~anomalias.suspeitas(historico).to_numpy()]
+        nova = calcular_ranking(historico, *self.janela).set_index('Pessoa')
+        if nova.empty:
+            self.linhas = self.linhas.drop(pessoa, errors='ignore')
+        elif pessoa in self.linhas.index:
+            self.linhas.loc[pessoa] = nova.loc[pessoa]
+        else:
+            self.linhas = pd.concat([self.linhas, nova])
+        self.versao = versao
+        self._resultado = None
+
+    def ranking(self):
+        """Mesmo formato de calcular_ranking (uma linha por pessoa, em ordem alfabética)."""
+        if self._resultado is None:
+            self._resultado = self.linhas.sort_index().reset_index()
+        return self._resultado
+
+# Tabelas do processo (compartilhadas entre sessões), uma por (banco, janela, sem
+# suspeitas) usada recentemente: as de grupos ociosos saem primeiro
+MAX_JANELAS = 32
+_trava = threading.Lock()
+_tabelas = OrderedDict()
+
+def _sem_suspeitas(df, versao, banco):
+    return df[~anomalias.analise_em_cache(df, versao, banco).any(axis=1).to_numpy()]
+
+def ranking_da_janela(df, versao, janela, banco=dados.ARQUIVO_BANCO, sem_suspeitas=False):
+    """Ranking de uma janela para a versão `versao` dos dados, compartilhado entre sessões.
+
+    Trocar de janela é uma consulta; após uma inserção registrada com registrar_medicao
+    só a linha de quem mediu é recalculada. Com `sem_suspeitas`, as medições marcadas
+    por anomalias.py ficam de fora. O resultado não deve ser alterado no lugar.
+
+    Uma versão mais antiga que a publicada (fragmento de uma sessão que ainda não
+    releu os dados) é calculada à parte, sem substituir a tabela mais nova.
+    """
+    chave = (banco, janela, sem_suspeitas)
+    with _trava:
+        tabela = _tabelas.get(chave)
+        antiga = tabela is not None and versao < tabela.versao
+        if not antiga:
+            if tabela is None or tabela.versao != versao:
+                base = _sem_suspeitas(df, versao, banco) if sem_suspeitas else df
+                tabela = TabelaRanking(base, versao, janela, sem_suspeitas)
+                _tabelas[chave] = tabela
+            _tabelas.move_to_end(chave)
+            while len(_tabelas) > MAX_JANELAS: _tabelas.popitem(last=False)
+            return tabela.ranking()
+    base = _sem_suspeitas(df, versao, banco) if sem_suspeitas else df
+    return calcular_ranking(base, *janela)
+
+def registrar_medicao(historico, pessoa, versao_anterior, versao_nova, banco=dados.ARQUIVO_BANCO):
+    """Aplica uma medição recém-inserida às tabelas que estavam em dia com `versao_anterior`.
+
+    `historico` é o histórico completo da pessoa (dados.carregar_pessoa). Tabelas em
+    outra versão ficam como estão e são refeitas por inteiro na próxima consulta.
+    """
+    with _trava:
+        for (banco_tabela, _, _), tabela in _tabelas.items():
+            if banco_tabela == banco and tabela.versao == versao_anterior:
+                tabela.atualizar_pessoa(historico, pessoa, versao_nova)
+
+def verificar_consistencia(df, versao, banco=dados.ARQUIVO_BANCO):
+    """Compara cada tabela incremental em dia com `versao` contra um recálculo completo.
+
+    Devolve a lista de janelas divergentes (vazia quando tudo bate).
+    """
+    with _trava:
+        tabelas = [t for (b, _, _), t in _tabelas.items() if b == banco and t.versao == versao]
+        divergentes = []
+        for tabela in tabelas:
+            base = _sem_suspeitas(df, versao, banco) if tabela.sem_suspeitas else df
+            completo = calcular_ranking(base, *tabela.janela)
+            incremental = tabela.ranking()[COLUNAS_RANKING]
+            try:
+                pd.testing.assert_frame_equal(incremental, completo, check_dtype=False, check_exact=True)
+            except AssertionError:
+                divergentes.append(tabela.janela)
+        return divergentes
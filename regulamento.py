@@ -1,7 +1,4 @@
 import streamlit as st
-import google.generativeai as genai
-import PIL.Image
-import time
 
 
 def exibir_regulamento(dados_aluno):
@@ -0,0 +1,17 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture
+def pasta_dpj(tmp_path, monkeypatch):
+    """Pasta de trabalho temporária com a planilha do DPJ (como na raiz do painel)."""
+    import dados
+    shutil.copy(os.path.join(RAIZ, dados.DATA_FILE), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+import agregados
+
+
+def _medicoes(n):
+    return pd.DataFrame({"Pessoa": [f"P{i % 5}" for i in range(n)],
+                         "Data": pd.date_range("2025-01-01", periods=n, freq="5D"),
+                         "Peso": [70.0 + i % 7 for i in range(n)], "Perc_Gordura": 25.0,
+                         "Perc_Musc": 35.0, "Visceral": 7.0})
+
+
+def test_registrar_medicao_publica_copia_sem_alterar_a_anterior():
+    df = _medicoes(40)
+    banco = "teste_agregados.db"
+    publicada = agregados.agregados_do_grupo(df.iloc[:-1], 1, banco)
+    antes = publicada.estatisticas("Peso").copy()
+
+    agregados.registrar_medicao(df.iloc[-1].to_dict(), 1, 2, banco)
+    atualizada = agregados.agregados_do_grupo(df, 2, banco)
+
+    assert atualizada is not publicada
+    pd.testing.assert_frame_equal(publicada.estatisticas("Peso"), antes)
+    pd.testing.assert_frame_equal(atualizada.estatisticas("Peso"), agregados.AgregadosGrupo(df, 2).estatisticas("Peso"))
+
+
+def test_versao_antiga_nao_substitui_agregados_publicados():
+    df = _medicoes(40)
+    banco = "teste_agregados_versao.db"
+    agregados.agregados_do_grupo(df.iloc[:-1], 1, banco)
+    agregados.registrar_medicao(df.iloc[-1].to_dict(), 1, 2, banco)
+    publicada = agregados.agregados_do_grupo(df, 2, banco)
+
+    antiga = agregados.agregados_do_grupo(df.iloc[:-1], 1, banco)  # fragmento de uma sessão atrasada
+
+    assert antiga.versao == 1 and antiga.medicoes == 39
+    assert agregados.agregados_do_grupo(df, 2, banco) is publicada
+
+
+def test_percentis_exatos_em_meses_com_poucas_medicoes():
+    df = pd.DataFrame({"Pessoa": ["A", "B", "C"], "Data": pd.to_datetime(["2025-01-03", "2025-01-10", "2025-01-20"]),
+                       "Peso": [60.0, 80.0, 101.3], "Perc_Gordura": 25.0, "Perc_Musc": 35.0, "Visceral": 7.0})
+    tabela = agregados.AgregadosGrupo(df.iloc[:2], 1)
+    tabela.adicionar(df.iloc[[2]], 2)
+
+    esperado = df["Peso"].quantile([p / 100 for p in agregados.PERCENTIS]).to_numpy()
+    obtido = tabela.estatisticas("Peso").iloc[0][[f"P{p}" for p in agregados.PERCENTIS]].to_numpy(dtype=float)
+    assert np.allclose(obtido, esperado)
+
+
+def test_meses_grandes_usam_o_histograma():
+    n = agregados.MAX_EXATO + 1
+    df = pd.DataFrame({"Pessoa": "A", "Data": pd.Timestamp("2025-01-15"), "Peso": [60.0] * (n - 1) + [100.0],
+                       "Perc_Gordura": 25.0, "Perc_Musc": 35.0, "Visceral": 7.0})
+    tabela = agregados.AgregadosGrupo(df, 1)
+
+    assert tabela.acumuladores["Peso"].valores == [None]
+    assert 60.0 <= tabela.estatisticas("Peso").iloc[0]["P50"] <= 60.0 + agregados.FAIXAS["Peso"][2]
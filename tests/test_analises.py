@@ -0,0 +1,40 @@
+import pandas as pd
+
+import analises
+
+
+def _medicoes(pessoa, pesos, inicio="2025-01-01", passo_dias=30):
+    datas = pd.date_range(inicio, periods=len(pesos), freq=f"{passo_dias}D")
+    return pd.DataFrame({"Pessoa": pessoa, "Data": datas, "Peso": pesos})
+
+
+def test_status_da_projecao():
+    df = pd.concat([
+        _medicoes("Estavel", [80.0, 80.0, 80.0]),
+        _medicoes("Longe", [80.0, 79.77, 79.54]),        # ~0,05 kg/semana, 30 kg da meta
+        _medicoes("Contraria", [80.0, 81.0, 82.0]),
+        _medicoes("Projetada", [80.0, 79.0, 78.0]),
+        _medicoes("Atingida", [70.05]),                  # uma pesagem só, já na meta
+        _medicoes("Poucos", [80.0]),
+        _medicoes("SemMeta", [80.0, 79.0]),
+    ], ignore_index=True)
+    metas = {"Estavel": 70.0, "Longe": 50.0, "Contraria": 70.0, "Projetada": 75.0,
+             "Atingida": 70.0, "Poucos": 70.0}
+
+    status = analises.projetar_metas(df, metas)["Status"].to_dict()
+
+    assert status == {"Atingida": "atingida", "Contraria": "tendencia_contraria", "Estavel": "estavel",
+                      "Longe": "longe", "Poucos": "poucos_dados", "Projetada": "projetada",
+                      "SemMeta": "sem_meta"}
+
+
+def test_resumo_em_faixas_igual_para_historicos_parecidos():
+    df = pd.concat([_medicoes("Ana", [80.0, 79.0, 78.1]), _medicoes("Bia", [90.0, 89.1, 88.0])], ignore_index=True)
+    df["Perc_Gordura"], df["Perc_Musc"] = 30.0, 35.0
+    ranking_df = pd.DataFrame({"Pessoa": ["Ana", "Bia"], "Indicador": [1.2, 3.4]})
+    resumo = analises.resumir_membros(df, analises.suavizar(df), ranking_df)
+
+    faixas = {p: analises.texto_faixas(resumo, p) for p in ["Ana", "Bia"]}
+
+    assert faixas["Ana"] == faixas["Bia"]
+    assert analises.texto_resumo(resumo, "Ana") != analises.texto_resumo(resumo, "Bia")
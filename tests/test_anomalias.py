@@ -0,0 +1,26 @@
+import pandas as pd
+
+import anomalias
+
+NORMAIS = [80.0, 80.2, 79.9, 80.1, 80.0, 79.8]
+
+
+def _historico(pesos):
+    return pd.DataFrame({"Pessoa": "Ana", "Data": pd.date_range("2025-01-01", periods=len(pesos), freq="7D"),
+                         "Peso": pesos, "Perc_Gordura": 30.0, "Perc_Musc": 35.0, "Visceral": 8.0})
+
+
+def test_pico_seguido_de_volta_marca_so_o_pico():
+    marcadas = anomalias.suspeitas(_historico(NORMAIS + [95.0, 80.0]))
+
+    assert marcadas.tolist() == [False] * 6 + [True, False]
+
+
+def test_ultima_medicao_atipica_e_marcada():
+    marcadas = anomalias.suspeitas(_historico(NORMAIS + [95.0]))
+
+    assert marcadas.tolist() == [False] * 6 + [True]
+
+
+def test_ultima_medicao_normal_nao_e_marcada():
+    assert not anomalias.suspeitas(_historico(NORMAIS + [80.1])).any()
@@ -0,0 +1,8 @@
+import cache_ia
+
+
+def test_nome_trocado_so_como_palavra_inteira(tmp_path):
+    arquivo = str(tmp_path / "cache.db")
+    cache_ia.guardar("k", "Ana, Analise o seu progresso, Ana.", 1.0, "Ana", arquivo)
+
+    assert cache_ia.obter("k", "Bruno", arquivo) == "Bruno, Analise o seu progresso, Bruno."
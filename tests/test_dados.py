@@ -0,0 +1,65 @@
+import threading
+
+import pandas as pd
+
+import dados
+
+
+def test_grupo_novo_nao_recebe_planilha_do_dpj_ao_inserir(pasta_dpj):
+    banco = str(pasta_dpj / "grupo_novo.db")
+    versao = dados.inserir_medicao({"Pessoa": "Bia", "Data": "2025-03-01", "Peso": 60.0}, banco)
+
+    assert versao == 1
+    assert dados.carregar_metas(banco) == {}
+    df = dados.load_data(banco)
+    assert df["Pessoa"].astype(str).tolist() == ["Bia"]
+
+
+def test_grupo_novo_nao_recebe_planilha_do_dpj_ao_importar(pasta_dpj):
+    banco = str(pasta_dpj / "grupo_novo.db")
+    bloco = pd.DataFrame({"Pessoa": ["Bia", "Caio"], "Data": pd.to_datetime(["2025-03-01", "2025-03-02"]),
+                          "Peso": [60.0, 80.0]}).reindex(columns=dados.COLUNAS)
+    resultado = dados.importar_medicoes([bloco], banco)
+
+    assert resultado.importadas == 2
+    assert dados.carregar_metas(banco) == {}
+    assert sorted(dados.load_data(banco)["Pessoa"].astype(str)) == ["Bia", "Caio"]
+
+
+def test_carregar_com_versao_migra_a_planilha_do_proprio_grupo(pasta_dpj):
+    banco = str(pasta_dpj / "dpj.db")
+    dados.inserir_medicao({"Pessoa": "Bia", "Data": "2025-03-01", "Peso": 60.0}, banco)
+    df, _ = dados.carregar_com_versao(banco, dados.DATA_FILE)
+
+    planilha = pd.read_excel(dados.DATA_FILE)
+    assert len(df) == len(planilha.dropna(subset=["Pessoa", "Data"])) + 1
+
+
+def test_salvar_meta_nao_muda_a_versao_das_medicoes(pasta_dpj):
+    banco = str(pasta_dpj / "grupo_novo.db")
+    dados.inserir_medicao({"Pessoa": "Bia", "Data": "2025-03-01", "Peso": 60.0}, banco)
+    df, versao = dados.carregar_com_versao(banco)
+    misses = dados.estatisticas["misses"]
+
+    assert dados.salvar_meta("Bia", 55.0, banco) == dados.versao_metas(banco) == 1
+    depois, versao_depois = dados.carregar_com_versao(banco)
+    assert versao_depois == versao and depois is df
+    assert dados.estatisticas["misses"] == misses
+    assert dados.carregar_metas(banco) == {"Bia": 55.0}
+
+
+def test_insercoes_concorrentes_nao_perdem_linhas(pasta_dpj):
+    banco = str(pasta_dpj / "grupo_novo.db")
+    threads, insercoes = 8, 10
+
+    def inserir(t):
+        for i in range(insercoes):
+            dados.inserir_medicao({"Pessoa": f"T{t}", "Data": f"2025-03-01 00:{i:02d}:00", "Peso": 60.0}, banco)
+
+    trabalhos = [threading.Thread(target=inserir, args=(t,)) for t in range(threads)]
+    for trabalho in trabalhos: trabalho.start()
+    for trabalho in trabalhos: trabalho.join()
+
+    df, versao = dados.carregar_com_versao(banco)
+    assert len(df) == versao == threads * insercoes
+    assert df.groupby("Pessoa", observed=True).size().eq(insercoes).all()
@@ -0,0 +1,24 @@
+import dados
+import importacao
+
+CSV = """Nome;Data/Hora;Peso (kg)
+Ana;31/01/2025;60,5
+Ana;31/01/2025 08:30;60,1
+Bia;2025-02-01;70
+Bia;01/02/2025;70
+;02/02/2025;50
+Caio;xx;80
+"""
+
+
+def test_importa_datas_com_hora_e_conta_invalidas(pasta_dpj):
+    caminho, banco = pasta_dpj / "exportacao.csv", str(pasta_dpj / "grupo_novo.db")
+    caminho.write_text(CSV, encoding="utf-8")
+    resultado = importacao.importar_arquivo(str(caminho), caminho.name, banco)
+
+    assert resultado == dados.ResultadoImportacao(lidas=6, importadas=3, duplicadas=1, invalidas=2)
+    df = dados.load_data(banco)
+    ana = df[df["Pessoa"] == "Ana"].sort_values("Data")
+    assert ana["Data"].dt.strftime("%d/%m/%Y %H:%M").tolist() == ["31/01/2025 00:00", "31/01/2025 08:30"]
+    # o banco novo só tem as linhas do arquivo (nada da planilha do DPJ na pasta)
+    assert sorted(df["Pessoa"].astype(str).unique()) == ["Ana", "Bia"]
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomalias
+import dados
+import ranking
+
+
+def _medicoes(membros=6, medicoes=5, semente=0):
+    rng = np.random.default_rng(semente)
+    n = membros * medicoes
+    return pd.DataFrame({
+        "Pessoa": np.repeat([f"P{i}" for i in range(membros)], medicoes),
+        "Data": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 200, n), unit="D"),
+        "Peso": rng.normal(80, 8, n).round(1), "IMC": rng.normal(26, 3, n).round(1),
+        "Perc_Gordura": rng.normal(28, 5, n).round(1), "Perc_Musc": rng.normal(35, 4, n).round(1),
+        "RM": 1700.0, "Idade": 40.0, "Visceral": rng.integers(4, 15, n).astype(float),
+    })
+
+
+def filtrar_por_periodo(group, trinta_dias):
+    """Cópia fiel da implementação anterior da tela de Ranking (referência)."""
+    group = group.sort_values('Data')
+    ultimo = group.iloc[-1]
+    if trinta_dias:
+        data_corte = ultimo['Data'] - pd.Timedelta(days=30)
+        dados_recentes = group[group['Data'] >= data_corte]
+        primeiro = dados_recentes.iloc[0] if not dados_recentes.empty else group.iloc[0]
+    else:
+        primeiro = group.iloc[0]
+
+    d_musculo = (ultimo['Perc_Musc'] - primeiro['Perc_Musc']) / primeiro['Perc_Musc']
+    d_gordura = (ultimo['Perc_Gordura'] - primeiro['Perc_Gordura']) / primeiro['Perc_Gordura']
+    d_visceral = (ultimo['Visceral'] - primeiro['Visceral']) / primeiro['Visceral']
+    d_peso = (ultimo['Peso'] - primeiro['Peso']) / primeiro['Peso']
+    indicador = 100*((d_musculo*0.4)+(d_gordura*-0.3)+(d_visceral*-0.2)+(d_peso*-0.1))
+
+    return pd.Series({
+        'Ganho_Musculo': ultimo['Perc_Musc'] - primeiro['Perc_Musc'],
+        'Perda_Gordura': primeiro['Perc_Gordura'] - ultimo['Perc_Gordura'],
+        'Peso_Atual': ultimo['Peso'],
+        'Data_Referencia': primeiro['Data'],
+        'Delta_Musculo:': d_musculo,
+        'Delta_Gordura:': d_gordura,
+        'Delta_Visceral:': d_visceral,
+        'Delta_Peso:': d_peso,
+        'Indicador': indicador})
+
+
+def ranking_legado(df, trinta_dias):
+    return df.sort_values('Data').groupby('Pessoa').apply(filtrar_por_periodo, trinta_dias=trinta_dias).reset_index()
+
+
+@pytest.mark.parametrize("compacto", [False, True], ids=["float64", "compactar_tipos"])
+@pytest.mark.parametrize("dias", [None, 30], ids=["todo_periodo", "30_dias"])
+def test_calcular_ranking_igual_ao_groupby_apply(dias, compacto):
+    df = _medicoes(membros=12, medicoes=8).drop_duplicates(["Pessoa", "Data"])  # empates de data: ordem ambígua
+    legado = ranking_legado(df, trinta_dias=dias is not None)
+    novo = ranking.calcular_ranking(dados.compactar_tipos(df) if compacto else df, dias)
+
+    assert list(novo.columns) == list(legado.columns)
+    assert novo['Pessoa'].tolist() == legado['Pessoa'].tolist()
+    assert (novo['Data_Referencia'].to_numpy() == pd.to_datetime(legado['Data_Referencia']).to_numpy()).all()
+    for coluna in ranking.COLUNAS_RANKING[1:]:
+        if coluna == 'Data_Referencia': continue
+        assert np.array_equal(novo[coluna].to_numpy(dtype='float64'), legado[coluna].to_numpy(dtype='float64'),
+                              equal_nan=True), coluna
+
+
+def test_versao_antiga_nao_substitui_tabela_publicada():
+    banco, janela = "teste_versao.db", ranking.Janela(dias=90)
+    df_v1 = _medicoes()
+    novo = {**df_v1.iloc[0].to_dict(), "Data": pd.Timestamp("2025-09-01"), "Peso": 70.0}
+    df_v2 = pd.concat([df_v1, pd.DataFrame([novo])], ignore_index=True)
+
+    ranking.ranking_da_janela(df_v1, 1, janela, banco)
+    ranking.registrar_medicao(df_v2[df_v2["Pessoa"] == "P0"], "P0", 1, 2, banco)
+    antigo = ranking.ranking_da_janela(df_v1, 1, janela, banco)  # fragmento de uma sessão atrasada
+
+    pd.testing.assert_frame_equal(antigo, ranking.calcular_ranking(df_v1, *janela))
+    assert ranking._tabelas[(banco, janela, False)].versao == 2
+    pd.testing.assert_frame_equal(ranking.ranking_da_janela(df_v2, 2, janela, banco)[ranking.COLUNAS_RANKING],
+                                  ranking.calcular_ranking(df_v2, *janela), check_dtype=False)
+
+
+def _conferir_atualizacao(antes, depois, pessoa, janela, sem_suspeitas=False):
+    """TabelaRanking da versão 1 atualizada só com o histórico de `pessoa` == recálculo da versão 2."""
+    filtrar = (lambda df: df[~anomalias.suspeitas(df).to_numpy()]) if sem_suspeitas else (lambda df: df)
+    tabela = ranking.TabelaRanking(filtrar(antes), 1, janela, sem_suspeitas)
+    tabela.atualizar_pessoa(depois[depois["Pessoa"] == pessoa], pessoa, 2)
+    pd.testing.assert_frame_equal(tabela.ranking()[ranking.COLUNAS_RANKING],
+                                  ranking.calcular_ranking(filtrar(depois), *janela), check_dtype=False, check_exact=True)
+
+
+def _inserir(df, pessoa, data, **metricas):
+    base = df[df["Pessoa"] == pessoa].iloc[-1].to_dict() if (df["Pessoa"] == pessoa).any() else df.iloc[0].to_dict()
+    return pd.concat([df, pd.DataFrame([{**base, "Pessoa": pessoa, "Data": pd.Timestamp(data), **metricas}])],
+                     ignore_index=True)
+
+
+@pytest.mark.parametrize("janela", [ranking.Janela(), ranking.Janela(dias=30)], ids=["todo_periodo", "30_dias"])
+def test_atualizar_pessoa_nova(janela):
+    antes = _medicoes()
+    depois = _inserir(antes, "Zeca", "2025-05-01", Peso=90.0)
+    _conferir_atualizacao(antes, depois, "Zeca", janela)
+
+
+@pytest.mark.parametrize("janela", [ranking.Janela(), ranking.Janela(dias=30)], ids=["todo_periodo", "30_dias"])
+def test_atualizar_pessoa_com_medicao_retroativa(janela):
+    antes = _medicoes()
+    depois = _inserir(antes, "P1", antes["Data"].min() - pd.Timedelta(days=10), Peso=95.0, Perc_Musc=30.0)
+    _conferir_atualizacao(antes, depois, "P1", janela)
+
+
+def test_atualizar_pessoa_sem_suspeitas():
+    datas = pd.date_range("2025-01-06", periods=8, freq="7D")
+    estavel = pd.DataFrame({"Pessoa": "P0", "Data": datas, "Peso": 80.0 - 0.2 * np.arange(8), "IMC": 26.0,
+                            "Perc_Gordura": 28.0, "Perc_Musc": 35.0, "RM": 1700.0, "Idade": 40.0, "Visceral": 9.0})
+    antes = pd.concat([_medicoes()[lambda df: df["Pessoa"] != "P0"], estavel], ignore_index=True)
+    depois = _inserir(antes, "P0", "2025-03-10", Peso=95.0)  # salto de 15 kg: suspeita
+    assert anomalias.suspeitas(depois).iloc[-1]
+
+    _conferir_atualizacao(antes, depois, "P0", ranking.Janela(), sem_suspeitas=True)